@@ -5,13 +5,29 @@ Supports MD5, SHA1, SHA256, SHA512, NTLM, and more
 Part of the NullSec Tools Collection
 """
 
+import os
+import re
 import sys
+import json
+import math
+import mmap
+import time
+import platform
+import threading
+import subprocess
+import hmac
+import heapq
+import struct
+import sqlite3
 import hashlib
 import argparse
-import itertools
 import string
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import Optional, List, Callable
+import tempfile
+from collections import OrderedDict
+from functools import partial
+from multiprocessing import Manager, Value
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, List, Dict, Set, Tuple, Callable, Iterable, Sequence
 
 BANNER = r"""
 ╔═══════════════════════════════════════════════════════════════╗
@@ -26,6 +42,844 @@ BANNER = r"""
 ╚═══════════════════════════════════════════════════════════════╝
 """
 
+# Shard sizing for parallel wordlist attacks
+SHARD_SIZE = 64 << 20
+BLOCK_SIZE = 4 << 20
+
+# Keyspace chunk sizing for parallel brute force
+CHUNK_CANDIDATES = 1 << 20
+STOP_CHECK_INTERVAL = 1 << 16
+
+# Attempts between progress callbacks and checkpoint checks
+PROGRESS_INTERVAL = 100000
+RULE_BATCH = 65536
+
+# Hash states of in-memory combinator words kept across kernel calls
+PREFIX_CACHE_STATES = 1 << 20
+
+# Built-in mask charsets (hashcat compatible)
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase.encode(),
+    'u': string.ascii_uppercase.encode(),
+    'd': string.digits.encode(),
+    'h': b'0123456789abcdef',
+    'H': b'0123456789ABCDEF',
+    's': b' ' + string.punctuation.encode(),
+}
+MASK_CHARSETS['a'] = MASK_CHARSETS['l'] + MASK_CHARSETS['u'] + MASK_CHARSETS['d'] + MASK_CHARSETS['s']
+MASK_CHARSETS['b'] = bytes(range(256))
+
+
+def expand_charset(spec: str, custom: Optional[Dict[str, bytes]] = None) -> bytes:
+    """Expand a charset spec like '?l?d_' into its unique bytes, in order"""
+    charset = bytearray()
+    for position in parse_mask(spec, custom):
+        for byte in position:
+            if byte not in charset:
+                charset.append(byte)
+    return bytes(charset)
+
+
+def parse_mask(mask: str, custom: Optional[Dict[str, bytes]] = None) -> List[bytes]:
+    """Parse a hashcat-style mask into one charset per candidate position"""
+    custom = custom or {}
+    positions = []
+    i = 0
+    while i < len(mask):
+        if mask[i] == '?' and i + 1 < len(mask):
+            key = mask[i + 1]
+            if key == '?':
+                positions.append(b'?')
+            elif key in custom:
+                positions.append(custom[key])
+            elif key in MASK_CHARSETS:
+                positions.append(MASK_CHARSETS[key])
+            else:
+                raise ValueError(f"Unknown mask charset: ?{key}")
+            i += 2
+        else:
+            # Literal characters, one position per encoded byte
+            positions.extend(bytes([b]) for b in mask[i].encode())
+            i += 1
+    return positions
+
+
+def format_plaintext(candidate: bytes) -> str:
+    """Decode a cracked candidate, falling back to hashcat's $HEX[] notation"""
+    try:
+        return candidate.decode('utf-8')
+    except UnicodeDecodeError:
+        return f"$HEX[{candidate.hex()}]"
+
+
+def parse_plaintext(plaintext: str) -> bytes:
+    """Inverse of format_plaintext"""
+    if plaintext.startswith('$HEX[') and plaintext.endswith(']'):
+        try:
+            return bytes.fromhex(plaintext[5:-1])
+        except ValueError:
+            pass
+    return plaintext.encode('utf-8')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of byte strings, cleared whenever it fills up
+    
+    Clearing at capacity bounds both memory and the false positive rate: a
+    candidate is wrongly taken as already tried (and skipped) with at most
+    error_rate probability, at the cost of forgetting older candidates.
+    """
+    
+    def __init__(self, size: int, error_rate: float = 0.001):
+        self.array = bytearray(max(1, size))
+        self.bits = len(self.array) * 8
+        # One 32-bit bit position per hash, all cut from a single BLAKE2b digest
+        hashes = min(16, max(1, round(-math.log2(error_rate))))
+        self.positions = struct.Struct(f'<{hashes}I')
+        self.capacity = max(1, int(self.bits * math.log(2) ** 2 / -math.log(error_rate)))
+        self.count = 0
+    
+    def add(self, item: bytes) -> bool:
+        """Add an item, returns False if it was (probably) already present"""
+        digest = hashlib.blake2b(item, digest_size=self.positions.size).digest()
+        array = self.array
+        new = False
+        for bit in self.positions.unpack(digest):
+            bit %= self.bits
+            mask = 1 << (bit & 7)
+            if not array[bit >> 3] & mask:
+                array[bit >> 3] |= mask
+                new = True
+        
+        if new:
+            self.count += 1
+            if self.count >= self.capacity:
+                self.clear()
+        return new
+    
+    def clear(self):
+        self.array = bytearray(len(self.array))
+        self.count = 0
+
+
+# Default rules for -r without a rule file, in hashcat syntax
+DEFAULT_RULES = ['c', 'u', 'sa4sA4se3sE3si1sI1so0sO0ss5sS5st7sT7', 'r',
+                 '$1$2$3', '$!', '$2$0$2$4', '$2$0$2$5']
+
+# Named rules accepted by apply_rule before hashcat syntax was supported
+LEGACY_RULES = {
+    'capitalize': 'c',
+    'uppercase': 'u',
+    'lowercase': 'l',
+    'reverse': 'r',
+    'leet': 'sa4sA4se3sE3si1sI1so0sO0ss5sS5st7sT7',
+}
+
+
+def _rule_swap(n: int, m: int, word: bytes) -> bytes:
+    if n >= len(word) or m >= len(word):
+        return word
+    chars = bytearray(word)
+    chars[n], chars[m] = chars[m], chars[n]
+    return bytes(chars)
+
+
+def _rule_title(word: bytes) -> bytes:
+    return b' '.join(part[:1].upper() + part[1:].lower() for part in word.split(b' '))
+
+
+# Rule functions: op -> (argument spec, function(*args, word))
+# N is a position (0-9, A-Z), X a literal byte. Rejection rules return None.
+RULE_FUNCTIONS = {
+    ':': ('', lambda w: w),
+    'l': ('', bytes.lower),
+    'u': ('', bytes.upper),
+    'c': ('', lambda w: w[:1].upper() + w[1:].lower()),
+    'C': ('', lambda w: w[:1].lower() + w[1:].upper()),
+    't': ('', bytes.swapcase),
+    'T': ('N', lambda n, w: w[:n] + w[n:n + 1].swapcase() + w[n + 1:]),
+    'r': ('', lambda w: w[::-1]),
+    'd': ('', lambda w: w + w),
+    'p': ('N', lambda n, w: w * (n + 1)),
+    'f': ('', lambda w: w + w[::-1]),
+    '{': ('', lambda w: w[1:] + w[:1]),
+    '}': ('', lambda w: w[-1:] + w[:-1]),
+    '$': ('X', lambda x, w: w + x),
+    '^': ('X', lambda x, w: x + w),
+    '[': ('', lambda w: w[1:]),
+    ']': ('', lambda w: w[:-1]),
+    'D': ('N', lambda n, w: w[:n] + w[n + 1:]),
+    'x': ('NN', lambda n, m, w: w[n:n + m]),
+    'O': ('NN', lambda n, m, w: w[:n] + w[n + m:]),
+    'i': ('NX', lambda n, x, w: w[:n] + x + w[n:] if n <= len(w) else w),
+    'o': ('NX', lambda n, x, w: w[:n] + x + w[n + 1:] if n < len(w) else w),
+    "'": ('N', lambda n, w: w[:n]),
+    's': ('XX', lambda x, y, w: w.replace(x, y)),
+    '@': ('X', lambda x, w: w.replace(x, b'')),
+    'z': ('N', lambda n, w: w[:1] * n + w),
+    'Z': ('N', lambda n, w: w + w[-1:] * n),
+    'q': ('', lambda w: bytes(b for b in w for _ in (0, 1))),
+    'k': ('', lambda w: w[1:2] + w[:1] + w[2:]),
+    'K': ('', lambda w: w[:-2] + w[-1:] + w[-2:-1] if len(w) >= 2 else w),
+    '*': ('NN', _rule_swap),
+    'E': ('', _rule_title),
+    '<': ('N', lambda n, w: w if len(w) <= n else None),
+    '>': ('N', lambda n, w: w if len(w) >= n else None),
+    '_': ('N', lambda n, w: w if len(w) == n else None),
+    '!': ('X', lambda x, w: None if x in w else w),
+    '/': ('X', lambda x, w: w if x in w else None),
+    '(': ('X', lambda x, w: w if w[:1] == x else None),
+    ')': ('X', lambda x, w: w if w[-1:] == x else None),
+    '=': ('NX', lambda n, x, w: w if w[n:n + 1] == x else None),
+    '%': ('NX', lambda n, x, w: w if w.count(x) >= n else None),
+}
+
+RULE_POSITIONS = string.digits + string.ascii_uppercase
+
+
+def compile_rule(rule: str) -> Callable[[bytes], Optional[bytes]]:
+    """Parse a hashcat rule line once into a callable over candidate bytes"""
+    steps = []
+    i = 0
+    while i < len(rule):
+        op = rule[i]
+        i += 1
+        if op == ' ':
+            continue
+        if op not in RULE_FUNCTIONS:
+            raise ValueError(f"Unsupported rule function '{op}' in: {rule}")
+        
+        spec, func = RULE_FUNCTIONS[op]
+        if i + len(spec) > len(rule):
+            raise ValueError(f"Missing argument for '{op}' in: {rule}")
+        args = []
+        for kind in spec:
+            arg = rule[i]
+            i += 1
+            if kind == 'N':
+                if arg not in RULE_POSITIONS:
+                    raise ValueError(f"Invalid position '{arg}' in: {rule}")
+                args.append(RULE_POSITIONS.index(arg))
+            else:
+                args.append(arg.encode('latin-1'))
+        steps.append(partial(func, *args) if args else func)
+    
+    if not steps:
+        return RULE_FUNCTIONS[':'][1]
+    if len(steps) == 1:
+        return steps[0]
+    
+    def apply(word: bytes) -> Optional[bytes]:
+        for step in steps:
+            word = step(word)
+            if word is None:
+                return None
+        return word
+    
+    return apply
+
+
+def translate_legacy_rule(rule: str) -> str:
+    """Map the old named rules (append_123, leet, ...) to hashcat syntax"""
+    if rule in LEGACY_RULES:
+        return LEGACY_RULES[rule]
+    for prefix, op in (('append_', '$'), ('year_', '$'), ('prepend_', '^')):
+        if rule.startswith(prefix):
+            text = rule[len(prefix):]
+            if op == '^':
+                text = text[::-1]
+            return ''.join(op + c for c in text)
+    return rule
+
+
+def load_rules(path: str) -> Tuple[List[str], int]:
+    """Read a hashcat rule file, returning the valid rules and the skipped count"""
+    rules = []
+    skipped = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            # Rule files are byte oriented, latin-1 keeps every byte as one char
+            rule = line.rstrip(b'\r\n').decode('latin-1')
+            if not rule.strip() or rule.startswith('#'):
+                continue
+            try:
+                compile_rule(rule)
+            except ValueError:
+                skipped += 1
+                continue
+            rules.append(rule)
+    return rules, skipped
+
+
+class Keyspace:
+    """Index-addressable keyspace of per-position charsets"""
+    
+    def __init__(self, layouts: List[List[bytes]]):
+        # (first index, per-position charsets, size) for every layout, in order
+        self.segments: List[Tuple[int, List[bytes], int]] = []
+        offset = 0
+        for positions in layouts:
+            if not positions or not all(positions):
+                raise ValueError("Empty keyspace position")
+            size = 1
+            for charset in positions:
+                size *= len(charset)
+            self.segments.append((offset, positions, size))
+            offset += size
+        self.size = offset
+    
+    def reorder(self, model: 'PositionModel') -> 'Keyspace':
+        """Same layouts with every position's charset in the model's order"""
+        return Keyspace([[model.order(position, charset)
+                          for position, charset in enumerate(positions)]
+                         for _, positions, _ in self.segments])
+    
+    @classmethod
+    def from_charset(cls, charset: str, min_len: int, max_len: int) -> 'Keyspace':
+        """Every candidate over one charset for a length range, shortest first"""
+        if not charset:
+            raise ValueError("Empty character set")
+        if min_len < 1 or max_len < min_len:
+            raise ValueError(f"Invalid length range: {min_len}-{max_len}")
+        charset = charset.encode()
+        return cls([[charset] * length for length in range(min_len, max_len + 1)])
+    
+    @classmethod
+    def from_mask(cls, mask: str, custom: Optional[Dict[str, bytes]] = None,
+                  increment: bool = False) -> 'Keyspace':
+        """Every candidate matching a mask, or each of its prefixes with increment"""
+        positions = parse_mask(mask, custom)
+        if not positions:
+            raise ValueError("Empty mask")
+        lengths = range(1, len(positions) + 1) if increment else [len(positions)]
+        return cls([positions[:length] for length in lengths])
+    
+    def locate(self, index: int) -> Tuple[int, List[int]]:
+        """Map a keyspace index to its segment and per-position charset digits"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Keyspace index out of range: {index}")
+        
+        for segment, (offset, positions, size) in enumerate(self.segments):
+            if index < offset + size:
+                rest = index - offset
+                digits = [0] * len(positions)
+                for pos in range(len(positions) - 1, -1, -1):
+                    rest, digits[pos] = divmod(rest, len(positions[pos]))
+                return segment, digits
+    
+    def candidate(self, index: int) -> bytes:
+        """Return the candidate at a keyspace index"""
+        segment, digits = self.locate(index)
+        positions = self.segments[segment][1]
+        return bytes(positions[pos][d] for pos, d in enumerate(digits))
+    
+    def iter_range(self, start: int, end: int) -> Iterable[bytearray]:
+        """Yield candidates start..end-1 in order, reusing one bytearray
+        
+        The yielded buffer is overwritten by the next candidate, so hash it
+        straight away and copy it only on a match.
+        """
+        if start >= end:
+            return
+        
+        segment, digits = self.locate(start)
+        positions = self.segments[segment][1]
+        buf = bytearray(positions[pos][d] for pos, d in enumerate(digits))
+        last = len(positions) - 1
+        remaining = end - start
+        
+        while True:
+            # Spin the last position in a tight loop, then carry into the prefix
+            tail = positions[last]
+            first = digits[last]
+            run = min(len(tail) - first, remaining)
+            for byte in tail[first:first + run]:
+                buf[last] = byte
+                yield buf
+            remaining -= run
+            if not remaining:
+                return
+            
+            digits[last] = 0
+            buf[last] = tail[0]
+            pos = last - 1
+            while pos >= 0:
+                digits[pos] += 1
+                if digits[pos] < len(positions[pos]):
+                    buf[pos] = positions[pos][digits[pos]]
+                    break
+                digits[pos] = 0
+                buf[pos] = positions[pos][0]
+                pos -= 1
+            else:
+                segment += 1
+                positions = self.segments[segment][1]
+                digits = [0] * len(positions)
+                buf = bytearray(charset[0] for charset in positions)
+                last = len(positions) - 1
+    
+    def split(self, chunk: int, start: int = 0,
+              end: Optional[int] = None) -> Iterable[Tuple[int, int]]:
+        """Yield contiguous (start, end) index ranges of at most chunk candidates"""
+        end = self.size if end is None else end
+        for first in range(start, end, chunk):
+            yield first, min(first + chunk, end)
+
+
+class PositionModel:
+    """Per-position character frequencies, used to try likely characters first
+    
+    Like hashcat's --markov ordering, but conditioned on the position only:
+    reordering (and optionally truncating) each position's charset keeps
+    the keyspace a fixed per-position layout, so it stays index-addressable
+    and splits across workers exactly like the lexicographic one.
+    """
+    
+    # Positions past this share the last trained one
+    MAX_POSITIONS = 32
+    
+    def __init__(self, counts: Optional[List[List[int]]] = None, threshold: int = 0):
+        self.counts = counts or []
+        self.threshold = threshold
+    
+    def train(self, words: Iterable[bytes]):
+        """Count the byte at every position of every word"""
+        counts = self.counts
+        for word in words:
+            word = word[:self.MAX_POSITIONS]
+            while len(counts) < len(word):
+                counts.append([0] * 256)
+            for position, byte in enumerate(word):
+                counts[position][byte] += 1
+    
+    @classmethod
+    def from_wordlist(cls, path: str, threshold: int = 0) -> 'PositionModel':
+        model = cls(threshold=threshold)
+        if not os.path.getsize(path):
+            return model
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for _, lines in iter_block_lines(mm, 0, len(mm)):
+                model.train(word for word in (line.strip() for line in lines) if word)
+        return model
+    
+    @classmethod
+    def from_potfile(cls, potfile: 'Potfile', threshold: int = 0) -> 'PositionModel':
+        model = cls(threshold=threshold)
+        model.train(parse_plaintext(plaintext) for plaintext in potfile.plaintexts())
+        return model
+    
+    def order(self, position: int, charset: bytes) -> bytes:
+        """The charset sorted by frequency at a position, ties kept in charset order"""
+        if not self.counts:
+            ordered = charset
+        else:
+            counts = self.counts[min(position, len(self.counts) - 1)]
+            ordered = bytes(sorted(charset, key=lambda byte: -counts[byte]))
+        return ordered[:self.threshold] if self.threshold else ordered
+    
+    def to_dict(self) -> Dict:
+        return {'counts': self.counts, 'threshold': self.threshold}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PositionModel':
+        return cls(data['counts'], data['threshold'])
+
+
+class Checkpoint:
+    """Restore file written periodically during long crack sessions"""
+    
+    VERSION = 1
+    
+    def __init__(self, path: str, interval: float = 30.0, args: Optional[Dict] = None):
+        self.path = path
+        self.interval = interval
+        self.args = args or {}
+        self.last_save = time.monotonic()
+    
+    def due(self) -> bool:
+        """Check if the save interval has elapsed"""
+        return time.monotonic() - self.last_save >= self.interval
+    
+    def save(self, state: Dict):
+        """Atomically replace the restore file with the given session state"""
+        state = dict(state, version=self.VERSION, args=self.args)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+        self.last_save = time.monotonic()
+    
+    @classmethod
+    def load(cls, path: str) -> Dict:
+        """Read a restore file"""
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported restore file: {path}")
+        return state
+    
+    def remove(self):
+        """Delete the restore file once the session has finished"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Potfile:
+    """Persistent digest -> plaintext store, indexed by SQLite"""
+    
+    DEFAULT_PATH = os.path.expanduser('~/.nullsec/hashcrack.pot')
+    
+    # SQLite caps the number of bound parameters per statement
+    LOOKUP_BATCH = 500
+    
+    def __init__(self, path: str = DEFAULT_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS pot ('
+            'algorithm TEXT NOT NULL, digest BLOB NOT NULL, plaintext TEXT NOT NULL, '
+            'PRIMARY KEY (algorithm, digest)) WITHOUT ROWID'
+        )
+        self.conn.commit()
+    
+    def lookup(self, algorithm: str, digests: Iterable[bytes]) -> Dict[bytes, str]:
+        """Return the known plaintexts for any of the given digests"""
+        digests = list(digests)
+        found = {}
+        for i in range(0, len(digests), self.LOOKUP_BATCH):
+            batch = digests[i:i + self.LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f'SELECT digest, plaintext FROM pot WHERE algorithm = ? AND digest IN ({placeholders})',
+                [algorithm, *batch]
+            )
+            found.update(rows)
+        return found
+    
+    def plaintexts(self) -> Iterable[str]:
+        """Every cracked plaintext, for training candidate models"""
+        for (plaintext,) in self.conn.execute('SELECT plaintext FROM pot'):
+            yield plaintext
+    
+    def add(self, algorithm: str, digest: bytes, plaintext: str):
+        """Store a cracked digest, committed straight away"""
+        self.conn.execute('INSERT OR REPLACE INTO pot VALUES (?, ?, ?)',
+                          (algorithm, digest, plaintext))
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+
+class DigestIndex:
+    """Sorted fixed-width digest -> wordlist offset file, searched in place via mmap"""
+    
+    MAGIC = b'NSDIGIX1'
+    HEADER = struct.Struct('<8s16sHQH')
+    OFFSET = struct.Struct('<Q')
+    
+    # Records sorted in memory before spilling a run to disk
+    RUN_RECORDS = 1 << 20
+    
+    # Where indexes go when the wordlist's directory isn't writable
+    DEFAULT_DIR = os.path.expanduser('~/.nullsec/indexes')
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        header = self.file.read(self.HEADER.size)
+        if len(header) != self.HEADER.size:
+            raise ValueError(f"Not a digest index: {path}")
+        magic, algorithm, self.digest_size, self.count, path_len = self.HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise ValueError(f"Not a digest index: {path}")
+        
+        self.algorithm = algorithm.rstrip(b'\0').decode()
+        self.wordlist = self.file.read(path_len).decode()
+        self.data_offset = self.HEADER.size + path_len
+        self.record_size = self.digest_size + self.OFFSET.size
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+    
+    def find(self, digest: bytes) -> Optional[int]:
+        """Binary search for a digest, returning its wordlist offset"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self.data_offset + mid * self.record_size
+            key = self.mm[pos:pos + self.digest_size]
+            if key < digest:
+                lo = mid + 1
+            elif key > digest:
+                hi = mid
+            else:
+                return self.OFFSET.unpack_from(self.mm, pos + self.digest_size)[0]
+        return None
+    
+    def lookup(self, digests: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """Return the wordlist entries for any of the given digests"""
+        found = {}
+        with open(self.wordlist, 'rb') as wordlist:
+            for digest in digests:
+                offset = self.find(digest)
+                if offset is not None:
+                    wordlist.seek(offset)
+                    found[digest] = wordlist.readline().strip()
+        return found
+    
+    def close(self):
+        if self.mm:
+            self.mm.close()
+        self.file.close()
+    
+    @staticmethod
+    def index_path(wordlist_path: str, algorithm: str, directory: Optional[str] = None) -> str:
+        if directory:
+            wordlist_path = os.path.join(directory, os.path.basename(wordlist_path))
+        return f"{wordlist_path}.{algorithm}.idx"
+    
+    @classmethod
+    def index_dir(cls, wordlist_path: str) -> str:
+        """Next to the wordlist if we may write there (system wordlists usually aren't)"""
+        directory = os.path.dirname(os.path.abspath(wordlist_path))
+        return directory if os.access(directory, os.W_OK) else cls.DEFAULT_DIR
+    
+    @classmethod
+    def build(cls, wordlist_path: str, algorithms: List[str],
+              directory: Optional[str] = None) -> Dict[str, Tuple[str, int]]:
+        """Hash a wordlist once into one index file per algorithm
+        
+        Returns {algorithm: (index path, unique digests)}. Records are
+        sorted in runs of RUN_RECORDS and merged, so memory stays bounded
+        for multi-GB wordlists. Indexes and the sort runs go to directory,
+        by default index_dir().
+        """
+        hash_funcs = {algo: HashCracker.ALGORITHMS[algo][0] for algo in algorithms}
+        wordlist_path = os.path.abspath(wordlist_path)
+        size = os.path.getsize(wordlist_path)
+        directory = directory or cls.index_dir(wordlist_path)
+        os.makedirs(directory, exist_ok=True)
+        results = {}
+        
+        with tempfile.TemporaryDirectory(dir=directory) as tmp:
+            runs = {algo: [] for algo in algorithms}
+            records = {algo: [] for algo in algorithms}
+            
+            def spill(algo: str):
+                run_path = os.path.join(tmp, f"{algo}.{len(runs[algo])}")
+                records[algo].sort()
+                with open(run_path, 'wb') as run:
+                    run.write(b''.join(records[algo]))
+                runs[algo].append(run_path)
+                records[algo] = []
+            
+            if size:
+                with open(wordlist_path, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    offset = 0
+                    for block_end, lines in iter_block_lines(mm, 0, size):
+                        for line in lines:
+                            word = line.strip()
+                            if word:
+                                packed = cls.OFFSET.pack(offset)
+                                for algo, hash_func in hash_funcs.items():
+                                    records[algo].append(hash_func(word).digest() + packed)
+                            offset += len(line) + 1
+                        offset = block_end
+                        
+                        for algo in algorithms:
+                            if len(records[algo]) >= cls.RUN_RECORDS:
+                                spill(algo)
+            
+            for algo in algorithms:
+                spill(algo)
+                path = cls.index_path(wordlist_path, algo, directory)
+                count = cls.merge_runs(runs[algo], path, algo, wordlist_path)
+                results[algo] = (path, count)
+        
+        return results
+    
+    @classmethod
+    def merge_runs(cls, run_paths: List[str], path: str, algorithm: str,
+                   wordlist_path: str) -> int:
+        """Merge sorted runs into an index file, keeping the first offset per digest"""
+        digest_size = HashCracker.ALGORITHMS[algorithm][1] // 2
+        record_size = digest_size + cls.OFFSET.size
+        encoded_path = wordlist_path.encode()
+        count = 0
+        
+        runs = [open(run_path, 'rb') for run_path in run_paths]
+        try:
+            with open(path, 'wb') as out:
+                out.write(cls.HEADER.pack(cls.MAGIC, algorithm.encode(), digest_size,
+                                          0, len(encoded_path)))
+                out.write(encoded_path)
+                
+                previous = None
+                streams = [iter(partial(run.read, record_size), b'') for run in runs]
+                for record in heapq.merge(*streams):
+                    digest = record[:digest_size]
+                    if digest == previous:
+                        continue
+                    out.write(record)
+                    previous = digest
+                    count += 1
+                
+                # Fill in the record count now that duplicates are known
+                out.seek(0)
+                out.write(cls.HEADER.pack(cls.MAGIC, algorithm.encode(), digest_size,
+                                          count, len(encoded_path)))
+        finally:
+            for run in runs:
+                run.close()
+        return count
+
+
+def _md4(data: bytes) -> bytes:
+    """Pure Python MD4 for OpenSSL builds without the legacy provider"""
+    mask = 0xffffffff
+    
+    def rotl(x: int, n: int) -> int:
+        x &= mask
+        return ((x << n) | (x >> (32 - n))) & mask
+    
+    message = bytearray(data)
+    message.append(0x80)
+    message.extend(b'\0' * ((56 - len(message)) % 64))
+    message += struct.pack('<Q', (len(data) * 8) & 0xffffffffffffffff)
+    
+    state = [0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476]
+    for chunk in range(0, len(message), 64):
+        x = struct.unpack('<16I', message[chunk:chunk + 64])
+        a, b, c, d = state
+        
+        # Each step updates a, then the registers rotate (a, b, c, d) -> (d, a, b, c)
+        for i in range(16):
+            a = rotl(a + ((b & c) | (~b & d)) + x[i], (3, 7, 11, 19)[i % 4])
+            a, b, c, d = d, a, b, c
+        for i, k in enumerate((0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15)):
+            a = rotl(a + ((b & c) | (b & d) | (c & d)) + x[k] + 0x5a827999, (3, 5, 9, 13)[i % 4])
+            a, b, c, d = d, a, b, c
+        for i, k in enumerate((0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15)):
+            a = rotl(a + (b ^ c ^ d) + x[k] + 0x6ed9eba1, (3, 9, 11, 15)[i % 4])
+            a, b, c, d = d, a, b, c
+        
+        state = [(s + v) & mask for s, v in zip(state, (a, b, c, d))]
+    
+    return struct.pack('<4I', *state)
+
+
+try:
+    hashlib.new('md4', b'')
+    md4_digest = lambda data: hashlib.new('md4', data).digest()
+except ValueError:
+    md4_digest = _md4
+
+
+def ntlm_digest(candidate: bytes) -> bytes:
+    """NTLM: MD4 over the UTF-16LE password (bytes that aren't UTF-8 map 1:1)"""
+    try:
+        password = candidate.decode('utf-8')
+    except UnicodeDecodeError:
+        password = candidate.decode('latin-1')
+    return md4_digest(password.encode('utf-16-le'))
+
+
+class BufferedState:
+    """hashlib-style state for formats that can only hash the whole candidate"""
+    
+    __slots__ = ('finish', 'data')
+    
+    def __init__(self, finish: Callable[[bytes], bytes], data: bytes = b''):
+        self.finish = finish
+        self.data = bytes(data)
+    
+    def update(self, data: bytes):
+        self.data += data
+    
+    def copy(self) -> 'BufferedState':
+        return BufferedState(self.finish, self.data)
+    
+    def digest(self) -> bytes:
+        return self.finish(self.data)
+
+
+class SaltSuffixState:
+    """hashlib-style state that appends the salt when the digest is taken"""
+    
+    __slots__ = ('state', 'salt')
+    
+    def __init__(self, state, salt: bytes):
+        self.state = state
+        self.salt = salt
+    
+    def update(self, data: bytes):
+        self.state.update(data)
+    
+    def copy(self) -> 'SaltSuffixState':
+        return SaltSuffixState(self.state.copy(), self.salt)
+    
+    def digest(self) -> bytes:
+        state = self.state.copy()
+        state.update(self.salt)
+        return state.digest()
+
+
+def _prefix_hasher(base, data: bytes = b''):
+    state = base.copy()
+    state.update(data)
+    return state
+
+
+def _suffix_hasher(hash_func: Callable, salt: bytes, data: bytes = b''):
+    return SaltSuffixState(hash_func(data), salt)
+
+
+def _hmac_pass(salt: bytes, digestmod: str, password: bytes) -> bytes:
+    return hmac.digest(password, salt, digestmod)
+
+
+# Salted formats, parsed from hash:salt lines: name -> (base algorithm, construction)
+#   <algo>-salt-pass   algo($salt.$pass)
+#   <algo>-pass-salt   algo($pass.$salt)
+#   hmac-<algo>-salt   HMAC-algo with key = $salt over $pass
+#   hmac-<algo>-pass   HMAC-algo with key = $pass over $salt
+SALTED_FORMATS = {}
+for _base in ('md5', 'sha1', 'sha256', 'sha512'):
+    SALTED_FORMATS[f'{_base}-salt-pass'] = (_base, 'salt-pass')
+    SALTED_FORMATS[f'{_base}-pass-salt'] = (_base, 'pass-salt')
+    SALTED_FORMATS[f'hmac-{_base}-salt'] = (_base, 'hmac-salt')
+    SALTED_FORMATS[f'hmac-{_base}-pass'] = (_base, 'hmac-pass')
+del _base
+
+
+def make_hasher(algorithm: str, salt: bytes = b'') -> Callable:
+    """Hash constructor for a format and salt, absorbing the salt up front where possible
+    
+    The result behaves like a hashlib constructor: hasher(data) returns a
+    state with update(), copy() and digest(), so every attack kernel and
+    the prefix-state reuse work the same for salted formats.
+    """
+    if algorithm in HashCracker.ALGORITHMS:
+        return HashCracker.ALGORITHMS[algorithm][0]
+    
+    base, construction = SALTED_FORMATS[algorithm]
+    hash_func = HashCracker.ALGORITHMS[base][0]
+    if construction == 'salt-pass':
+        return partial(_prefix_hasher, hash_func(salt))
+    if construction == 'pass-salt':
+        return partial(_suffix_hasher, hash_func, salt)
+    if construction == 'hmac-salt':
+        return partial(_prefix_hasher, hmac.new(salt, digestmod=hash_func))
+    return partial(BufferedState, partial(_hmac_pass, salt, base))
+
+
 class HashCracker:
     """Multi-algorithm hash cracking tool"""
     
@@ -36,26 +890,118 @@ class HashCracker:
         'sha512': (hashlib.sha512, 128),
         'sha384': (hashlib.sha384, 96),
         'sha224': (hashlib.sha224, 56),
+        'ntlm': (partial(BufferedState, ntlm_digest), 32),
     }
     
-    def __init__(self, target_hash: str, algorithm: str = 'auto'):
-        self.target_hash = target_hash.lower().strip()
+    def __init__(self, target_hash: Optional[str] = None, algorithm: str = 'auto',
+                 hash_file: Optional[str] = None):
+        hashes = [target_hash] if target_hash else []
+        if hash_file:
+            hashes.extend(self.read_hash_file(hash_file))
+        if not hashes:
+            raise ValueError("No target hash given")
+        
+        self.target_hash = hashes[0].strip()
         self.algorithm = algorithm
         self.hash_func = None
         self.attempts = 0
+        # While a process pool runs, workers also add to a shared counter
+        # mid-job; attempts only grows as whole jobs report back
+        self.worker_attempts = None
+        self.worker_base = 0
         self.found = False
         self.plaintext = None
         
+        # Remaining targets grouped by salt (b'' when unsalted) and keyed by
+        # raw digest, so each candidate is hashed once per unique salt.
+        # Cracked ones are keyed by their hash line.
+        self.salts: Dict[bytes, Dict[bytes, str]] = {}
+        self.hashers: Dict[bytes, Callable] = {}
+        self.cracked: Dict[str, str] = {}
+        self.skipped = 0
+        
+        # Where the running attack can be resumed from, saved by the checkpoint
+        self.checkpoint: Optional[Checkpoint] = None
+        self.resume_point: Optional[Dict] = None
+        # Size of the running attack in resume point units (bytes or keyspace indexes)
+        self.progress_total = 0
+        self.compiled_rules: Dict[str, Callable] = {}
+        self.potfile: Optional[Potfile] = None
+        # Brute force and mask candidate order, kept in checkpoints since a
+        # potfile-trained model changes as hashes crack
+        self.markov: Optional[PositionModel] = None
+        
         if algorithm == 'auto':
             self.algorithm = self.detect_algorithm()
         
         if self.algorithm in self.ALGORITHMS:
             self.hash_func = self.ALGORITHMS[self.algorithm][0]
+            self.salted = False
+        elif self.algorithm in SALTED_FORMATS:
+            self.hash_func = self.ALGORITHMS[SALTED_FORMATS[self.algorithm][0]][0]
+            self.salted = True
         else:
             raise ValueError(f"Unsupported algorithm: {self.algorithm}")
+        
+        for hash_line in hashes:
+            if not self.add_target(hash_line):
+                self.skipped += 1
+        
+        if not self.salts:
+            raise ValueError(f"No valid {self.algorithm} hashes to crack")
+        self.total_targets = self.remaining()
+    
+    @staticmethod
+    def read_hash_file(path: str) -> List[str]:
+        """Read one hash per line from a hash list"""
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return [line.strip() for line in f if line.strip()]
+    
+    def add_target(self, hash_line: str) -> bool:
+        """Add a hex digest (hash:salt for salted formats), returns False if malformed"""
+        hash_line = hash_line.strip()
+        salt = b''
+        if self.salted:
+            if ':' not in hash_line:
+                return False
+            hash_hex, salt_text = hash_line.split(':', 1)
+            salt = salt_text.encode()
+            hash_length = self.ALGORITHMS[SALTED_FORMATS[self.algorithm][0]][1]
+        else:
+            hash_hex = hash_line
+            hash_length = self.ALGORITHMS[self.algorithm][1]
+        
+        hash_hex = hash_hex.lower()
+        if len(hash_hex) != hash_length:
+            return False
+        try:
+            digest = bytes.fromhex(hash_hex)
+        except ValueError:
+            return False
+        
+        hash_line = f"{hash_hex}:{salt_text}" if self.salted else hash_hex
+        self.salts.setdefault(salt, {})[digest] = hash_line
+        return True
+    
+    def remaining(self) -> int:
+        """Number of targets not cracked yet"""
+        return sum(len(group) for group in self.salts.values())
+    
+    def hasher(self, salt: bytes) -> Callable:
+        """Hash constructor with the salt absorbed, built once per salt"""
+        if salt not in self.hashers:
+            self.hashers[salt] = make_hasher(self.algorithm, salt)
+        return self.hashers[salt]
+    
+    def target_sets(self) -> Dict[bytes, frozenset]:
+        """Remaining digests per salt, as handed to worker processes"""
+        return {salt: frozenset(group) for salt, group in self.salts.items()}
     
     def detect_algorithm(self) -> str:
         """Auto-detect hash algorithm based on length"""
+        if ':' in self.target_hash:
+            raise ValueError("Salted hashes need an explicit format (-a), "
+                             f"one of: {', '.join(SALTED_FORMATS)}")
         hash_len = len(self.target_hash)
         
         for algo, (func, length) in self.ALGORITHMS.items():
@@ -68,108 +1014,1051 @@ class HashCracker:
         
         raise ValueError(f"Cannot auto-detect algorithm for hash length {hash_len}")
     
-    def compute_hash(self, plaintext: str) -> str:
+    def compute_hash(self, plaintext: str, salt: bytes = b'') -> str:
         """Compute hash of plaintext"""
-        return self.hash_func(plaintext.encode()).hexdigest()
+        return make_hasher(self.algorithm, salt)(plaintext.encode()).digest().hex()
     
     def check_password(self, password: str) -> bool:
-        """Check if password matches target hash"""
-        self.attempts += 1
-        if self.compute_hash(password) == self.target_hash:
-            self.found = True
-            self.plaintext = password
-            return True
-        return False
-    
-    def dictionary_attack(self, wordlist_path: str, callback: Callable = None) -> Optional[str]:
-        """Perform dictionary attack using wordlist"""
+        """Check if password matches any remaining target hash"""
+        candidate = password.encode()
+        cracked, attempts = crack_salts(crack_candidates, self.hasher, self.salts, [candidate])
+        self.attempts += attempts
+        self.merge_cracked(cracked)
+        return bool(cracked)
+    
+    def mark_cracked(self, digest: bytes, plaintext: str, store: bool = True, salt: bytes = b''):
+        """Move a target from the remaining set to the cracked results"""
+        group = self.salts.get(salt)
+        if not group or digest not in group:
+            return
+        hash_line = group.pop(digest)
+        if not group:
+            del self.salts[salt]
+            self.hashers.pop(salt, None)
+        
+        self.cracked[hash_line] = plaintext
+        self.plaintext = plaintext
+        self.found = not self.salts
+        if store and self.potfile:
+            self.potfile.add(self.algorithm, digest + salt, plaintext)
+    
+    def merge_cracked(self, cracked: Dict[bytes, Dict[bytes, bytes]]):
+        """Record kernel results, {salt: {digest: candidate}}"""
+        for salt, found in cracked.items():
+            for digest, candidate in found.items():
+                self.mark_cracked(digest, format_plaintext(candidate), salt=salt)
+    
+    def check_index(self, index: DigestIndex) -> int:
+        """Mark every target found in a prebuilt digest index as cracked, returns how many"""
+        if index.algorithm != self.algorithm:
+            raise ValueError(f"Index {index.path} is {index.algorithm}, not {self.algorithm}")
+        found = index.lookup(list(self.salts.get(b'', ())))
+        for digest, word in found.items():
+            self.mark_cracked(digest, format_plaintext(word))
+        return len(found)
+    
+    def check_potfile(self) -> int:
+        """Mark every target already in the potfile as cracked, returns how many"""
+        if not self.potfile:
+            return 0
+        # Salted entries are keyed by digest + salt, the digest being fixed width
+        keys = {digest + salt: (salt, digest)
+                for salt, group in self.salts.items() for digest in group}
+        known = self.potfile.lookup(self.algorithm, keys)
+        for key, plaintext in known.items():
+            salt, digest = keys[key]
+            self.mark_cracked(digest, plaintext, store=False, salt=salt)
+        return len(known)
+    
+    def begin_attack(self, attack: str, start: int, total: int):
+        """Record the attack about to run and its size, for checkpoints and status"""
+        self.resume_point = dict(attack=attack, position=start)
+        self.progress_total = total
+    
+    def update_resume_point(self, attack: str, position: int, **extra):
+        """Record where the running attack can resume, saving if a checkpoint is due"""
+        self.resume_point = dict(extra, attack=attack, position=position)
+        if self.checkpoint and self.checkpoint.due():
+            self.save_checkpoint()
+    
+    def save_checkpoint(self):
+        """Write the resume point and uncracked targets to the restore file"""
+        if not self.checkpoint or not self.resume_point:
+            return
+        self.checkpoint.save(dict(
+            self.resume_point,
+            algorithm=self.algorithm,
+            attempts=self.attempts,
+            remaining=[line for group in self.salts.values() for line in group.values()],
+            cracked=self.cracked,
+            markov=self.markov.to_dict() if self.markov else None,
+        ))
+    
+    def load_checkpoint(self, state: Dict):
+        """Restore targets, results and resume point from a restore file"""
+        self.salts = {}
+        self.hashers = {}
+        for hash_line in state['remaining']:
+            self.add_target(hash_line)
+        self.cracked = dict(state['cracked'])
+        self.total_targets = self.remaining() + len(self.cracked)
+        self.attempts = state['attempts']
+        self.found = not self.salts
+        if state.get('markov'):
+            self.markov = PositionModel.from_dict(state['markov'])
+        self.resume_point = {key: value for key, value in state.items()
+                             if key not in ('version', 'args', 'algorithm', 'attempts',
+                                            'remaining', 'cracked', 'markov')}
+    
+    def dictionary_attack(self, wordlist_path: str, callback: Callable = None,
+                          workers: int = 1, start: int = 0) -> Optional[str]:
+        """Perform dictionary attack using wordlist, optionally from a byte offset"""
         try:
-            with open(wordlist_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    password = line.strip()
-                    if not password:
-                        continue
-                    
-                    if self.check_password(password):
-                        return password
-                    
-                    if callback and self.attempts % 100000 == 0:
-                        callback(self.attempts)
+            size = os.path.getsize(wordlist_path)
         except FileNotFoundError:
             print(f"[-] Wordlist not found: {wordlist_path}")
+            return None
+        self.begin_attack('dictionary', start, size)
+        if workers > 1:
+            return self.parallel_dictionary_attack(wordlist_path, workers, callback, start)
+        if start >= size:
+            return None
+        
+        # Lines are hashed as raw bytes straight out of the mapping and
+        # compared by digest, nothing is decoded unless it cracks
+        with open(wordlist_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset, lines in iter_block_lines(mm, start, size):
+                cracked, attempts = crack_salts(crack_lines, self.hasher, self.salts, lines)
+                self.attempts += attempts
+                self.merge_cracked(cracked)
+                if self.found:
+                    return self.plaintext
+                
+                self.update_resume_point('dictionary', offset)
+                if callback:
+                    callback(self.attempts)
         
         return None
     
-    def brute_force(self, charset: str, min_len: int, max_len: int,
-                   callback: Callable = None) -> Optional[str]:
-        """Perform brute force attack"""
-        for length in range(min_len, max_len + 1):
-            for combo in itertools.product(charset, repeat=length):
-                password = ''.join(combo)
-                
-                if self.check_password(password):
-                    return password
-                
-                if callback and self.attempts % 100000 == 0:
-                    callback(self.attempts, password)
+    def parallel_dictionary_attack(self, wordlist_path: str, workers: int,
+                                   callback: Callable = None, start: int = 0) -> Optional[str]:
+        """Split an mmap'd wordlist into newline-aligned shards across processes"""
+        try:
+            shards = shard_wordlist(wordlist_path, workers * 4, start)
+        except FileNotFoundError:
+            print(f"[-] Wordlist not found: {wordlist_path}")
+            return None
+        
+        jobs = ((start, (wordlist_path, start, end)) for start, end in shards)
+        self.run_workers(_dictionary_shard, jobs, workers, 'dictionary', callback)
+        return self.plaintext if self.found else None
+    
+    def combinator_attack(self, left_path: str, right_path: str, separator: str = '',
+                          callback: Callable = None, workers: int = 1,
+                          start: int = 0) -> Optional[str]:
+        """Hash every left + separator + right pair of two wordlists
+        
+        The smaller list is kept in memory and the larger one streamed (and
+        sharded across workers) like a dictionary attack, so the resume
+        point is a byte offset into the larger list.
+        """
+        try:
+            streamed_left = os.path.getsize(left_path) >= os.path.getsize(right_path)
+        except FileNotFoundError as e:
+            print(f"[-] Wordlist not found: {e.filename}")
+            return None
+        streamed, kept = (left_path, right_path) if streamed_left else (right_path, left_path)
+        words = load_words(kept)
+        if not words:
+            return None
+        try:
+            return self.stream_attack(streamed, 'combinator', crack_combinator,
+                                      (words, separator.encode(), streamed_left), len(words),
+                                      callback, workers, start)
+        finally:
+            _prefix_cache.clear()
+    
+    def hybrid_attack(self, wordlist_path: str, mask: str,
+                      custom: Optional[Dict[str, bytes]] = None, mask_left: bool = False,
+                      increment: bool = False, callback: Callable = None,
+                      workers: int = 1, start: int = 0) -> Optional[str]:
+        """Hash every word followed by every mask candidate (or preceded, with mask_left)"""
+        keyspace = Keyspace.from_mask(mask, custom, increment)
+        try:
+            return self.stream_attack(wordlist_path, 'hybrid', crack_hybrid,
+                                      (keyspace, mask_left), keyspace.size,
+                                      callback, workers, start)
+        except FileNotFoundError:
+            print(f"[-] Wordlist not found: {wordlist_path}")
+            return None
+    
+    def stream_attack(self, wordlist_path: str, attack: str, kernel: Callable, kernel_args: Tuple,
+                      fanout: int, callback: Callable = None, workers: int = 1,
+                      start: int = 0) -> Optional[str]:
+        """Run a kernel over a wordlist whose lines each expand to fanout candidates
+        
+        kernel(hasher, lines, *kernel_args, targets) is fed about
+        PROGRESS_INTERVAL candidates' worth of lines at a time. The resume
+        point is a byte offset, so it never gets finer than one line: a line
+        expanding to more than that many candidates is run in a single call.
+        """
+        size = os.path.getsize(wordlist_path)
+        self.begin_attack(attack, start, size)
+        if start >= size:
+            return None
+        
+        if workers > 1:
+            shards = shard_wordlist(wordlist_path, workers * 4, start)
+            jobs = ((first, (wordlist_path, first, end, kernel, kernel_args, fanout))
+                    for first, end in shards)
+            self.run_workers(_stream_shard, jobs, workers, attack, callback)
+            return self.plaintext if self.found else None
+        
+        step = max(1, PROGRESS_INTERVAL // fanout)
+        with open(wordlist_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for block_end, lines in iter_block_lines(mm, start, size):
+                for first in range(0, len(lines), step):
+                    chunk = lines[first:first + step]
+                    cracked, attempts = crack_salts(kernel, self.hasher, self.salts,
+                                                    chunk, *kernel_args)
+                    self.attempts += attempts
+                    self.merge_cracked(cracked)
+                    if self.found:
+                        return self.plaintext
+                    
+                    start = min(block_end, start + sum(len(line) + 1 for line in chunk))
+                    self.update_resume_point(attack, start)
+                    if callback:
+                        callback(self.attempts)
         
         return None
     
-    def rule_attack(self, base_words: List[str], rules: List[str]) -> Optional[str]:
-        """Apply transformation rules to base words"""
-        for word in base_words:
-            # Original word
-            if self.check_password(word):
-                return word
+    @property
+    def live_attempts(self) -> int:
+        """Attempts so far, including those of pool jobs still running"""
+        counter = self.worker_attempts
+        if counter is None:
+            return self.attempts
+        return max(self.attempts, self.worker_base + counter.value)
+    
+    def run_workers(self, job_func: Callable, jobs: Iterable[Tuple[int, Tuple]], workers: int,
+                    attack: str, callback: Callable = None, total: int = 0):
+        """Feed (position, args) jobs to a process pool and merge cracks as they report back"""
+        jobs = iter(jobs)
+        next_job = next(jobs, None)
+        # Stays set afterwards: live_attempts never reads below attempts
+        self.worker_attempts = Value('Q', 0)
+        self.worker_base = self.attempts
+        with Manager() as manager:
+            stop = manager.Event()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.algorithm, stop,
+                                               self.worker_attempts)) as pool:
+                pending = {}
+                while True:
+                    # Keep a couple of jobs queued per worker so each one is
+                    # submitted with the targets still uncracked at that point
+                    while next_job is not None and len(pending) < workers * 2:
+                        position, job_args = next_job
+                        future = pool.submit(job_func, *job_args, self.target_sets())
+                        pending[future] = position
+                        next_job = next(jobs, None)
+                    if not pending:
+                        break
+                    
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del pending[future]
+                        cracked, attempts = future.result()
+                        self.attempts += attempts
+                        self.merge_cracked(cracked)
+                    
+                    # Everything before the oldest unfinished job is done
+                    if pending or next_job is not None:
+                        low_water = min(pending.values()) if pending else next_job[0]
+                        self.update_resume_point(attack, low_water)
+                        if callback:
+                            if total:
+                                callback(low_water, '', total)
+                            else:
+                                callback(self.attempts)
+                    if self.found:
+                        stop.set()
+                        for future in pending:
+                            future.cancel()
+                        break
+    
+    def brute_force(self, charset: str, min_len: int, max_len: int,
+                   callback: Callable = None, workers: int = 1,
+                   start: int = 0) -> Optional[str]:
+        """Perform brute force attack, optionally from a keyspace index"""
+        keyspace = Keyspace.from_charset(charset, min_len, max_len)
+        return self.keyspace_attack(keyspace, 'bruteforce', callback, workers, start)
+    
+    def mask_attack(self, mask: str, custom: Optional[Dict[str, bytes]] = None,
+                    increment: bool = False, callback: Callable = None,
+                    workers: int = 1, start: int = 0) -> Optional[str]:
+        """Perform mask attack with per-position charsets (?l?u?d?s?a?b?h?H, ?1-?4)"""
+        keyspace = Keyspace.from_mask(mask, custom, increment)
+        return self.keyspace_attack(keyspace, 'mask', callback, workers, start)
+    
+    def keyspace_attack(self, keyspace: Keyspace, attack: str, callback: Callable = None,
+                        workers: int = 1, start: int = 0) -> Optional[str]:
+        """Hash every candidate of a keyspace from a start index"""
+        if self.markov:
+            keyspace = keyspace.reorder(self.markov)
+        self.begin_attack(attack, start, keyspace.size)
+        if workers > 1:
+            chunk = max(1, min(CHUNK_CANDIDATES, -(-keyspace.size // (workers * 4))))
+            jobs = ((first, (keyspace, first, end))
+                    for first, end in keyspace.split(chunk, start))
+            self.run_workers(_keyspace_range, jobs, workers, attack, callback, keyspace.size)
+            return self.plaintext if self.found else None
+        
+        for first, end in keyspace.split(PROGRESS_INTERVAL, start):
+            cracked, attempts = crack_salts(crack_keyspace, self.hasher, self.salts,
+                                            keyspace, first, end)
+            self.attempts += attempts
+            self.merge_cracked(cracked)
+            if self.found:
+                return self.plaintext
             
-            for rule in rules:
-                transformed = self.apply_rule(word, rule)
-                if transformed and self.check_password(transformed):
-                    return transformed
+            self.update_resume_point(attack, end)
+            if callback:
+                callback(end, format_plaintext(keyspace.candidate(end - 1)), keyspace.size)
         
         return None
     
+    def rule_attack(self, wordlist_path: str, rules: List[str], callback: Callable = None,
+                    start: int = 0, bloom_size: int = 0) -> Optional[str]:
+        """Stream a wordlist through compiled rules, optionally from a word offset
+        
+        Duplicate rule output for a word is dropped before hashing, and with
+        bloom_size (bytes) so is output already seen for earlier words.
+        """
+        # The first transform tries the original word
+        transforms = [compile_rule(':')] + [self.compile(rule) for rule in rules]
+        bloom = BloomFilter(bloom_size) if bloom_size else None
+        
+        try:
+            with open(wordlist_path, 'rb') as f:
+                self.begin_attack('rules', start, os.fstat(f.fileno()).st_size)
+                f.seek(start)
+                offset = start
+                batch = []
+                for line in f:
+                    offset += len(line)
+                    word = line.strip()
+                    if not word:
+                        continue
+                    
+                    # Rules often give back the word itself (l on a lowercase
+                    # word) or each other's output, keep the first of each
+                    candidates = dict.fromkeys(transform(word) for transform in transforms)
+                    candidates.pop(None, None)
+                    candidates.pop(b'', None)
+                    if bloom:
+                        batch.extend(filter(bloom.add, candidates))
+                    else:
+                        batch.extend(candidates)
+                    
+                    # Hash in batches ending on a word boundary, so the
+                    # resume point is simply the next word's offset
+                    if len(batch) >= RULE_BATCH:
+                        if self.crack_batch(batch):
+                            return self.plaintext
+                        batch = []
+                        self.update_resume_point('rules', offset)
+                        if callback:
+                            callback(self.attempts)
+                
+                if batch and self.crack_batch(batch):
+                    return self.plaintext
+        except FileNotFoundError:
+            print(f"[-] Wordlist not found: {wordlist_path}")
+        
+        return None
+    
+    def crack_batch(self, candidates: List[bytes]) -> bool:
+        """Hash a batch of candidates against every salt, returns True once all are cracked"""
+        cracked, attempts = crack_salts(crack_candidates, self.hasher, self.salts, candidates)
+        self.attempts += attempts
+        self.merge_cracked(cracked)
+        return self.found
+    
+    def compile(self, rule: str) -> Callable[[bytes], Optional[bytes]]:
+        """Compile a hashcat or legacy named rule, caching the result"""
+        if rule not in self.compiled_rules:
+            self.compiled_rules[rule] = compile_rule(translate_legacy_rule(rule))
+        return self.compiled_rules[rule]
+    
     def apply_rule(self, word: str, rule: str) -> Optional[str]:
         """Apply a transformation rule to a word"""
-        if rule == 'capitalize':
-            return word.capitalize()
-        elif rule == 'uppercase':
-            return word.upper()
-        elif rule == 'lowercase':
-            return word.lower()
-        elif rule == 'reverse':
-            return word[::-1]
-        elif rule == 'leet':
-            leet_map = {'a': '4', 'e': '3', 'i': '1', 'o': '0', 's': '5', 't': '7'}
-            return ''.join(leet_map.get(c.lower(), c) for c in word)
-        elif rule.startswith('append_'):
-            suffix = rule[7:]
-            return word + suffix
-        elif rule.startswith('prepend_'):
-            prefix = rule[8:]
-            return prefix + word
-        elif rule.startswith('year_'):
-            year = rule[5:]
-            return word + year
-        return None
+        try:
+            result = self.compile(rule)(word.encode())
+        except ValueError:
+            return None
+        return format_plaintext(result) if result is not None else None
+
+
+def shard_wordlist(path: str, count: int, start: int = 0) -> List[Tuple[int, int]]:
+    """Split a file from a line-aligned offset into byte ranges on line boundaries"""
+    size = os.path.getsize(path)
+    if start >= size:
+        return []
+    count = max(count, -(-(size - start) // SHARD_SIZE))
+    first = start
+    
+    shards = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, count + 1):
+            end = first + (size - first) * i // count
+            if end < size:
+                newline = mm.find(b'\n', end)
+                end = size if newline == -1 else newline + 1
+            if end > start:
+                shards.append((start, end))
+                start = end
+            if start >= size:
+                break
+    return shards
+
+
+def iter_block_lines(mm, start: int, end: int) -> Iterable[Tuple[int, List[bytes]]]:
+    """Yield (block end offset, lines) for mm[start:end] in newline-aligned blocks"""
+    pos = start
+    while pos < end:
+        block_end = min(end, pos + BLOCK_SIZE)
+        if block_end < end:
+            newline = mm.rfind(b'\n', pos, block_end)
+            if newline == -1:
+                newline = mm.find(b'\n', block_end, end)
+            block_end = end if newline == -1 else newline + 1
+        yield block_end, mm[pos:block_end].split(b'\n')
+        pos = block_end
+
+
+# Per-process state for pool workers, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(algorithm: str, stop, progress):
+    _worker['algorithm'] = algorithm
+    _worker['hashers'] = {}
+    _worker['stop'] = stop
+    _worker['progress'] = progress
+
+
+def _count_attempts(count: int):
+    """Add to the pool's shared attempt counter, so speed shows before a job finishes"""
+    progress = _worker['progress']
+    with progress.get_lock():
+        progress.value += count
+
+
+def _worker_hasher(salt: bytes) -> Callable:
+    hashers = _worker['hashers']
+    if salt not in hashers:
+        hashers[salt] = make_hasher(_worker['algorithm'], salt)
+    return hashers[salt]
+
+
+def _drop_cracked(salts: Dict[bytes, Set[bytes]], cracked: Dict[bytes, Dict[bytes, bytes]],
+                  results: Dict[bytes, Dict[bytes, bytes]]):
+    """Merge a kernel's cracks into a worker's results and its remaining targets"""
+    for salt, found in cracked.items():
+        results.setdefault(salt, {}).update(found)
+        salts[salt].difference_update(found)
+        if not salts[salt]:
+            del salts[salt]
+
+
+def _dictionary_shard(wordlist_path: str, start: int, end: int,
+                      targets: Dict[bytes, Set[bytes]]) -> Tuple[Dict, int]:
+    """Worker: hash one wordlist shard against the target digests of every salt"""
+    stop = _worker['stop']
+    salts = {salt: set(group) for salt, group in targets.items()}
+    cracked = {}
+    attempts = 0
+    
+    with open(wordlist_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for _, lines in iter_block_lines(mm, start, end):
+            # Checking the shared event costs an IPC round trip, so only per block
+            if stop.is_set():
+                break
+            found, count = crack_salts(crack_lines, _worker_hasher, salts, lines)
+            attempts += count
+            _count_attempts(count)
+            _drop_cracked(salts, found, cracked)
+            if not salts:
+                break
+    
+    return cracked, attempts
+
+
+def crack_salts(kernel: Callable, hasher_for: Callable, salts: Dict[bytes, Dict],
+                *args) -> Tuple[Dict[bytes, Dict[bytes, bytes]], int]:
+    """Run a crack kernel once per unique salt over the same candidates
+    
+    kernel(hasher, *args, targets) must return ({digest: candidate}, attempts).
+    """
+    cracked = {}
+    attempts = 0
+    for salt, targets in list(salts.items()):
+        found, count = kernel(hasher_for(salt), *args, targets)
+        attempts += count
+        if found:
+            cracked[salt] = found
+    return cracked, attempts
+
+
+def crack_candidates(hash_func: Callable, candidates: List[bytes],
+                     targets) -> Tuple[Dict[bytes, bytes], int]:
+    """Hash ready-made candidates, returning cracked digests and attempts"""
+    cracked = {}
+    for attempts, candidate in enumerate(candidates, 1):
+        digest = hash_func(candidate).digest()
+        if digest in targets:
+            cracked[digest] = candidate
+            if len(cracked) == len(targets):
+                return cracked, attempts
+    return cracked, len(candidates)
+
+
+def crack_lines(hash_func: Callable, lines: List[bytes],
+                targets) -> Tuple[Dict[bytes, bytes], int]:
+    """Hash raw wordlist lines, returning cracked digests and attempts"""
+    cracked = {}
+    attempts = 0
+    for line in lines:
+        word = line.strip()
+        if not word:
+            continue
+        attempts += 1
+        digest = hash_func(word).digest()
+        if digest in targets:
+            cracked[digest] = word
+            if len(cracked) == len(targets):
+                break
+    return cracked, attempts
+
+
+def crack_keyspace(hash_func: Callable, keyspace: Keyspace, start: int, end: int,
+                   targets, suffixes: Sequence[bytes] = (b'',)) -> Tuple[Dict[bytes, bytes], int]:
+    """Hash keyspace candidates start..end-1, returning cracked digests and attempts
+    
+    Consecutive candidates only differ in their last positions, so a hash
+    state is kept for every prefix depth and .copy()'d, and only the bytes
+    that changed get hashed. Each candidate is hashed once per suffix.
+    """
+    cracked = {}
+    attempts = 0
+    if start >= end:
+        return cracked, attempts
+    
+    segment, digits = keyspace.locate(start)
+    positions = keyspace.segments[segment][1]
+    last = len(positions) - 1
+    fanout = len(suffixes)
+    tails = [bytes([byte]) + suffix for byte in positions[last] for suffix in suffixes]
+    states = [hash_func()] + [None] * last
+    changed = 0
+    remaining = end - start
+    
+    while True:
+        # Rehash the prefix from the first position that changed
+        for depth in range(changed, last):
+            state = states[depth].copy()
+            state.update(positions[depth][digits[depth]:digits[depth] + 1])
+            states[depth + 1] = state
+        
+        copy = states[last].copy
+        first = digits[last]
+        run = min(len(positions[last]) - first, remaining)
+        for i in range(first * fanout, (first + run) * fanout):
+            state = copy()
+            state.update(tails[i])
+            digest = state.digest()
+            if digest in targets:
+                prefix = bytes(positions[pos][digits[pos]] for pos in range(last))
+                cracked[digest] = prefix + tails[i]
+                if len(cracked) == len(targets):
+                    return cracked, attempts + i - first * fanout + 1
+        attempts += run * fanout
+        remaining -= run
+        if not remaining:
+            return cracked, attempts
+        
+        # Carry into the prefix, rolling over into the next segment
+        digits[last] = 0
+        changed = last - 1
+        while changed >= 0:
+            digits[changed] += 1
+            if digits[changed] < len(positions[changed]):
+                break
+            digits[changed] = 0
+            changed -= 1
+        else:
+            segment += 1
+            positions = keyspace.segments[segment][1]
+            last = len(positions) - 1
+            tails = [bytes([byte]) + suffix for byte in positions[last] for suffix in suffixes]
+            states = [states[0]] + [None] * last
+            digits = [0] * len(positions)
+            changed = 0
+
+
+def load_words(path: str) -> List[bytes]:
+    """Read a whole wordlist into memory as stripped, non-empty byte strings"""
+    with open(path, 'rb') as f:
+        return [word for word in (line.strip() for line in f) if word]
+
+
+# Per-process {(hasher, separator): (words, [(prefix, state.copy)])}, least recently used first
+_prefix_cache = OrderedDict()
+
+
+def combinator_prefixes(hash_func: Callable, words: List[bytes],
+                        separator: bytes) -> List[Tuple[bytes, Callable]]:
+    """Hashed left + separator states for the in-memory words, built once per salt
+    
+    A kernel call may only cover a line or two of the streamed list, so
+    rebuilding these every call would double the hashing. Entries are
+    evicted oldest first beyond PREFIX_CACHE_STATES states in total.
+    """
+    key = (hash_func, separator)
+    entry = _prefix_cache.get(key)
+    if entry is not None and entry[0] is words:
+        _prefix_cache.move_to_end(key)
+        return entry[1]
+    
+    prefixes = [(left + separator, hash_func(left + separator).copy) for left in words]
+    _prefix_cache[key] = (words, prefixes)
+    _prefix_cache.move_to_end(key)
+    cached = sum(len(cached_words) for cached_words, _ in _prefix_cache.values())
+    while cached > PREFIX_CACHE_STATES and len(_prefix_cache) > 1:
+        evicted, _ = _prefix_cache.popitem(last=False)[1]
+        cached -= len(evicted)
+    return prefixes
 
 
-def progress_callback(attempts: int, current: str = ""):
+def crack_combinator(hash_func: Callable, lines: List[bytes], words: List[bytes],
+                     separator: bytes, streamed_left: bool,
+                     targets) -> Tuple[Dict[bytes, bytes], int]:
+    """Hash every pairing of raw wordlist lines with an in-memory word list
+    
+    The left half of each pair is hashed once and its state .copy()'d for
+    every right half. When the streamed lines are the right halves, the
+    states of the in-memory left words come from combinator_prefixes().
+    """
+    cracked = {}
+    attempts = 0
+    if streamed_left:
+        tails = words
+    else:
+        prefixes = combinator_prefixes(hash_func, words, separator)
+    
+    for line in lines:
+        word = line.strip()
+        if not word:
+            continue
+        if streamed_left:
+            prefix = word + separator
+            pairs = [(prefix, hash_func(prefix).copy)]
+        else:
+            pairs = prefixes
+            tails = (word,)
+        
+        for prefix, copy in pairs:
+            for tail in tails:
+                attempts += 1
+                state = copy()
+                state.update(tail)
+                digest = state.digest()
+                if digest in targets:
+                    cracked[digest] = prefix + tail
+                    if len(cracked) == len(targets):
+                        return cracked, attempts
+    return cracked, attempts
+
+
+def crack_hybrid(hash_func: Callable, lines: List[bytes], keyspace: Keyspace, mask_left: bool,
+                 targets) -> Tuple[Dict[bytes, bytes], int]:
+    """Hash raw wordlist lines joined with every mask candidate
+    
+    With the mask on the right each word is hashed once and its state
+    seeds the prefix-state keyspace kernel. With the mask on the left the
+    same kernel walks the mask with every word as a suffix, so each
+    candidate is one state copy and update however few words a call gets.
+    """
+    remaining = set(targets)
+    cracked = {}
+    attempts = 0
+    words = [word for word in (line.strip() for line in lines) if word]
+    
+    if not mask_left:
+        for word in words:
+            found, count = crack_keyspace(partial(_prefix_hasher, hash_func(word)),
+                                          keyspace, 0, keyspace.size, remaining)
+            attempts += count
+            for digest, tail in found.items():
+                cracked[digest] = word + tail
+            remaining.difference_update(found)
+            if not remaining:
+                break
+        return cracked, attempts
+    
+    if not words:
+        return cracked, attempts
+    return crack_keyspace(hash_func, keyspace, 0, keyspace.size, remaining, words)
+
+
+def _stream_shard(wordlist_path: str, start: int, end: int, kernel: Callable,
+                  kernel_args: Tuple, fanout: int,
+                  targets: Dict[bytes, Set[bytes]]) -> Tuple[Dict, int]:
+    """Worker: run a per-line kernel over one wordlist shard"""
+    stop = _worker['stop']
+    salts = {salt: set(group) for salt, group in targets.items()}
+    cracked = {}
+    attempts = 0
+    step = max(1, STOP_CHECK_INTERVAL // fanout)
+    
+    with open(wordlist_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for _, lines in iter_block_lines(mm, start, end):
+            for first in range(0, len(lines), step):
+                if stop.is_set() or not salts:
+                    return cracked, attempts
+                found, count = crack_salts(kernel, _worker_hasher, salts,
+                                           lines[first:first + step], *kernel_args)
+                attempts += count
+                _count_attempts(count)
+                _drop_cracked(salts, found, cracked)
+    
+    return cracked, attempts
+
+
+def _keyspace_range(keyspace: Keyspace, start: int, end: int,
+                    targets: Dict[bytes, Set[bytes]]) -> Tuple[Dict, int]:
+    """Worker: hash one contiguous keyspace range against the target digests of every salt"""
+    stop = _worker['stop']
+    salts = {salt: set(group) for salt, group in targets.items()}
+    cracked = {}
+    attempts = 0
+    
+    for first, last in keyspace.split(STOP_CHECK_INTERVAL, start, end):
+        if stop.is_set():
+            break
+        found, count = crack_salts(crack_keyspace, _worker_hasher, salts, keyspace, first, last)
+        attempts += count
+        _count_attempts(count)
+        _drop_cracked(salts, found, cracked)
+        if not salts:
+            break
+    
+    return cracked, attempts
+
+
+class Benchmark:
+    """Fixed, deterministic workloads timed per algorithm and attack mode
+    
+    Every run hashes the same candidates against a digest that can't
+    crack, so the numbers compare across machines and versions.
+    """
+    
+    VERSION = 1
+    
+    DICTIONARY_WORDS = 100000
+    RULE_WORDS = 10000
+    BRUTE_FORCE = (string.digits, 1, 5)
+    MASK = '?l?l?l?d'
+    
+    # Per-core scaling uses larger workloads so pool startup doesn't dominate
+    SCALING_ALGORITHM = 'md5'
+    SCALING_WORDS = 1000000
+    SCALING_BRUTE_FORCE = (string.ascii_lowercase, 1, 4)
+    SCALING_MASK = '?l?l?l?d?d'
+    
+    RUST_BINARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                               'rust', 'target', 'release', 'nullsec-hashcrack')
+    RUST_ALGORITHMS = ('md5', 'sha1', 'sha256', 'sha512')
+    RUST_TIMEOUT = 300
+    
+    def __init__(self, max_workers: int = 1, rust_binary: str = RUST_BINARY,
+                 log: Callable = None):
+        self.max_workers = max(1, max_workers)
+        self.rust_binary = os.path.normpath(rust_binary)
+        self.log = log or (lambda message: None)
+        self.wordlists: Dict[str, str] = {}
+    
+    @staticmethod
+    def write_wordlist(path: str, count: int):
+        with open(path, 'wb') as f:
+            for first in range(0, count, 65536):
+                f.write(b''.join(b'bench%07d\n' % i
+                                 for i in range(first, min(first + 65536, count))))
+    
+    @staticmethod
+    def worker_counts(max_workers: int) -> List[int]:
+        """1, 2, 4, ... up to and including max_workers"""
+        counts = []
+        count = 1
+        while count < max_workers:
+            counts.append(count)
+            count *= 2
+        return counts + [max_workers]
+    
+    def measure(self, algorithm: str, attack: str, workers: int = 1,
+                scaling: bool = False) -> Dict:
+        """Time one attack over its fixed workload, returns hashes, seconds and H/s"""
+        cracker = HashCracker('0' * HashCracker.ALGORITHMS[algorithm][1], algorithm)
+        
+        start_time = time.perf_counter()
+        if attack == 'dictionary':
+            wordlist = self.wordlists['scaling' if scaling else 'dictionary']
+            cracker.dictionary_attack(wordlist, workers=workers)
+        elif attack == 'rules':
+            cracker.rule_attack(self.wordlists['rules'], DEFAULT_RULES)
+        elif attack == 'bruteforce':
+            charset, min_len, max_len = self.SCALING_BRUTE_FORCE if scaling else self.BRUTE_FORCE
+            cracker.brute_force(charset, min_len, max_len, workers=workers)
+        else:
+            cracker.mask_attack(self.SCALING_MASK if scaling else self.MASK, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        
+        return {
+            'hashes': cracker.attempts,
+            'seconds': round(elapsed, 4),
+            'hashes_per_second': round(cracker.attempts / elapsed) if elapsed else 0,
+        }
+    
+    def measure_rust(self, algorithm: str, threads: int) -> Dict:
+        """Run the Rust cracker over the dictionary workload and parse its speed line"""
+        target = '0' * HashCracker.ALGORITHMS[algorithm][1]
+        try:
+            proc = subprocess.run([self.rust_binary, target, self.wordlists['dictionary'],
+                                   str(threads)], capture_output=True, text=True,
+                                  timeout=self.RUST_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return {'error': str(e)}
+        
+        speed = re.search(r'Speed: ([\d.]+) H/s', proc.stdout)
+        attempts = re.search(r'Attempts: (\d+)', proc.stdout)
+        if proc.returncode != 0 or not speed:
+            return {'error': f"exited with status {proc.returncode}"}
+        return {
+            'hashes': int(attempts.group(1)) if attempts else None,
+            'hashes_per_second': round(float(speed.group(1))),
+        }
+    
+    def run(self) -> Dict:
+        """Run every workload, returns the JSON-ready report"""
+        report = {
+            'benchmark_version': self.VERSION,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'workloads': {
+                'dictionary': {'words': self.DICTIONARY_WORDS},
+                'rules': {'words': self.RULE_WORDS, 'rules': DEFAULT_RULES},
+                'bruteforce': dict(zip(('charset', 'min_len', 'max_len'), self.BRUTE_FORCE)),
+                'mask': {'mask': self.MASK},
+            },
+            'algorithms': {},
+        }
+        
+        with tempfile.TemporaryDirectory(prefix='hashcrack-bench-') as workdir:
+            for name, count in (('dictionary', self.DICTIONARY_WORDS),
+                                ('rules', self.RULE_WORDS),
+                                ('scaling', self.SCALING_WORDS)):
+                self.wordlists[name] = os.path.join(workdir, f"{name}.txt")
+                self.write_wordlist(self.wordlists[name], count)
+            
+            for algorithm in HashCracker.ALGORITHMS:
+                results = report['algorithms'][algorithm] = {}
+                for attack in ('dictionary', 'rules', 'bruteforce', 'mask'):
+                    results[attack] = self.measure(algorithm, attack)
+                    self.log(f"[*] {algorithm} {attack}: "
+                             f"{results[attack]['hashes_per_second']:,} H/s")
+            
+            report['scaling'] = self.run_scaling()
+            report['rust'] = self.run_rust(report['algorithms'])
+        
+        return report
+    
+    def run_scaling(self) -> Dict:
+        """H/s of the parallel attacks at 1, 2, 4, ... workers, relative to one worker"""
+        scaling = {
+            'algorithm': self.SCALING_ALGORITHM,
+            'workloads': {
+                'dictionary': {'words': self.SCALING_WORDS},
+                'bruteforce': dict(zip(('charset', 'min_len', 'max_len'),
+                                       self.SCALING_BRUTE_FORCE)),
+                'mask': {'mask': self.SCALING_MASK},
+            },
+        }
+        for attack in ('dictionary', 'bruteforce', 'mask'):
+            runs = scaling[attack] = []
+            for workers in self.worker_counts(self.max_workers):
+                result = self.measure(self.SCALING_ALGORITHM, attack, workers, scaling=True)
+                speedup = result['hashes_per_second'] / max(1, runs[0]['hashes_per_second']) \
+                    if runs else 1.0
+                runs.append(dict(result, workers=workers, speedup=round(speedup, 2),
+                                 efficiency=round(speedup / workers, 2)))
+                self.log(f"[*] scaling {attack} x{workers}: "
+                         f"{result['hashes_per_second']:,} H/s ({speedup:.2f}x)")
+        return scaling
+    
+    def run_rust(self, python_results: Dict) -> Dict:
+        """Compare the bundled Rust cracker against the dictionary numbers, if it's built"""
+        rust = {'binary': self.rust_binary, 'available': os.access(self.rust_binary, os.X_OK)}
+        if not rust['available']:
+            return rust
+        
+        rust['results'] = {}
+        for algorithm in self.RUST_ALGORITHMS:
+            runs = rust['results'][algorithm] = []
+            for threads in sorted({1, self.max_workers}):
+                result = self.measure_rust(algorithm, threads)
+                result['threads'] = threads
+                if threads == 1 and 'hashes_per_second' in result:
+                    python_speed = python_results[algorithm]['dictionary']['hashes_per_second']
+                    result['python_hashes_per_second'] = python_speed
+                    result['rust_vs_python'] = round(result['hashes_per_second'] /
+                                                     max(1, python_speed), 2)
+                runs.append(result)
+                self.log(f"[*] rust {algorithm} x{threads}: "
+                         f"{result.get('hashes_per_second', result.get('error'))}")
+        return rust
+
+
+class StatusReporter:
+    """Background thread reporting speed, progress, ETA and cracks on an interval
+    
+    It samples the counters and resume point the attacks already update
+    once per chunk, so the loops being measured don't do any extra work.
+    Pool workers only report whole jobs, so their speed comes from the
+    shared counter they bump at each stop check (live_attempts).
+    """
+    
+    def __init__(self, cracker: HashCracker, interval: float = 5.0,
+                 json_path: Optional[str] = None):
+        self.cracker = cracker
+        self.interval = interval
+        self.json_path = json_path
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='hashcrack-status', daemon=True)
+        
+        now = time.monotonic()
+        self.start_time = now
+        self.start_attempts = cracker.live_attempts
+        self.last = (now, self.start_attempts)
+        # (attack, time, position) when the running attack was first seen
+        self.attack_start = (None, now, 0)
+    
+    def start(self) -> 'StatusReporter':
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the thread, leaving a final snapshot in the status file"""
+        self.stopped.set()
+        self.thread.join()
+        if self.json_path:
+            self.write_json(self.snapshot())
+    
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            status = self.snapshot()
+            self.print_status(status)
+            if self.json_path:
+                self.write_json(status)
+    
+    def snapshot(self) -> Dict:
+        cracker = self.cracker
+        now = time.monotonic()
+        attempts = cracker.live_attempts
+        point = cracker.resume_point or {}
+        attack = point.get('attack')
+        position = point.get('position', 0)
+        total = cracker.progress_total
+        
+        last_time, last_attempts = self.last
+        self.last = (now, attempts)
+        if attack != self.attack_start[0]:
+            self.attack_start = (attack, now, position)
+        
+        # ETA from the attack's average rate, steadier than the last interval
+        # when workers report back in whole jobs
+        _, since, first = self.attack_start
+        eta = None
+        if total and position > first and now > since:
+            eta = (total - position) / ((position - first) / (now - since))
+        
+        elapsed = now - self.start_time
+        return {
+            'time': time.time(),
+            'elapsed': round(elapsed, 1),
+            'attack': attack,
+            'position': position,
+            'total': total,
+            'progress': round(position / total, 4) if total else None,
+            'hashes_per_second': round((attempts - last_attempts) / max(now - last_time, 1e-9)),
+            'average_hashes_per_second': round((attempts - self.start_attempts) /
+                                               max(elapsed, 1e-9)),
+            'eta_seconds': round(eta) if eta is not None else None,
+            'attempts': attempts,
+            'cracked': len(cracker.cracked),
+            'targets': cracker.total_targets,
+        }
+    
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+    
+    def print_status(self, status: Dict):
+        progress = f" {status['progress']:.2%}" if status['progress'] is not None else ""
+        eta = f" | ETA {self.format_duration(status['eta_seconds'])}" \
+            if status['eta_seconds'] is not None else ""
+        print(f"\r[*] {status['attack'] or 'Starting'}{progress} | "
+              f"{status['hashes_per_second']:,} H/s{eta} | "
+              f"Cracked {status['cracked']:,}/{status['targets']:,} | "
+              f"Attempts {status['attempts']:,}", end='', flush=True)
+    
+    def write_json(self, status: Dict):
+        """Replace the status file atomically, so readers never see half a snapshot"""
+        tmp_path = self.json_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self.json_path)
+
+
+def progress_callback(attempts: int, current: str = "", total: int = 0):
     """Print progress"""
     current_str = f" | Current: {current[:20]}" if current else ""
-    print(f"\r[*] Attempts: {attempts:,}{current_str}", end='', flush=True)
+    if total:
+        print(f"\r[*] Progress: {attempts:,} / {total:,} ({attempts / total:.2%}){current_str}",
+              end='', flush=True)
+    else:
+        print(f"\r[*] Attempts: {attempts:,}{current_str}", end='', flush=True)
 
 
 def main():
-    print(BANNER)
-    
     parser = argparse.ArgumentParser(
         description='NullSec Hash Cracker - Multi-Algorithm Hash Cracking'
     )
-    parser.add_argument('hash', help='Target hash to crack')
+    parser.add_argument('hash', nargs='?', help='Target hash to crack')
+    parser.add_argument('-H', '--hash-file',
+                       help='File with one hash per line (cracked in a single pass)')
     parser.add_argument('-a', '--algorithm', default='auto',
-                       choices=['auto', 'md5', 'sha1', 'sha256', 'sha512'],
-                       help='Hash algorithm (default: auto-detect)')
+                       choices=['auto'] + list(HashCracker.ALGORITHMS) + list(SALTED_FORMATS),
+                       metavar='ALGORITHM',
+                       help='Hash algorithm or salted format, e.g. ntlm, md5-salt-pass, '
+                            'hmac-sha256-salt (default: auto-detect)')
     parser.add_argument('-w', '--wordlist', help='Path to wordlist file')
     parser.add_argument('-b', '--bruteforce', action='store_true',
                        help='Enable brute force mode')
@@ -178,11 +2067,130 @@ def main():
                        help='Character set for brute force')
     parser.add_argument('--min-len', type=int, default=1, help='Minimum password length')
     parser.add_argument('--max-len', type=int, default=6, help='Maximum password length')
-    parser.add_argument('-r', '--rules', action='store_true',
-                       help='Enable rule-based attack')
+    parser.add_argument('-r', '--rules', nargs='?', const=True, metavar='RULE_FILE',
+                       help='Enable rule-based attack, optionally with a hashcat rule file')
+    parser.add_argument('--rule-bloom', type=float, default=0, metavar='MB',
+                       help='Also skip rule output already tried for earlier words, using a '
+                            'Bloom filter of this size (worth it for slow or many-salt formats)')
+    parser.add_argument('-c', '--combinator', metavar='WORDLIST',
+                       help='Combinator attack: every word of -w followed by every word '
+                            'of this list')
+    parser.add_argument('--separator', default='',
+                       help='String placed between combined words (default: none)')
+    parser.add_argument('--hybrid', metavar='MASK',
+                       help='Hybrid attack: every word of -w followed by every candidate '
+                            'of this mask, e.g. ?d?d?d?s')
+    parser.add_argument('--hybrid-left', action='store_true',
+                       help='Put the hybrid mask in front of each word instead')
+    parser.add_argument('-m', '--mask',
+                       help='Mask attack, e.g. ?u?l?l?l?d?d (?l ?u ?d ?s ?a ?b ?h ?H ?1-?4)')
+    for i in range(1, 5):
+        parser.add_argument(f'-{i}', f'--custom-charset{i}', metavar='CHARSET',
+                           help=f'Custom charset for ?{i} in masks, e.g. ?l?d')
+    parser.add_argument('--increment', action='store_true',
+                       help='Also try every shorter prefix of the mask')
+    parser.add_argument('--markov', metavar='SOURCE',
+                       help="Order brute force and mask candidates by per-position character "
+                            "frequencies trained from a wordlist, or 'potfile'")
+    parser.add_argument('--markov-threshold', type=int, default=0, metavar='N',
+                       help='Only try the N likeliest characters per position (default: all)')
+    parser.add_argument('-j', '--workers', type=int,
+                       help='Worker processes for parallel attacks (default: 1, 0 = all cores)')
+    parser.add_argument('--session', default='hashcrack.restore',
+                       help='Restore file for checkpoints (default: hashcrack.restore)')
+    parser.add_argument('--restore', action='store_true',
+                       help='Resume the session saved in the restore file')
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0,
+                       help='Seconds between checkpoints (default: 30)')
+    parser.add_argument('--potfile', default=Potfile.DEFAULT_PATH,
+                       help=f'Cracked hash store (default: {Potfile.DEFAULT_PATH})')
+    parser.add_argument('--no-potfile', action='store_true',
+                       help='Neither read nor update the potfile')
+    parser.add_argument('--show', action='store_true',
+                       help='Print targets already in the potfile and exit')
+    parser.add_argument('--build-index', nargs='?', const='md5,sha1,sha256', metavar='ALGOS',
+                       help='Hash the wordlist into sorted digest indexes and exit '
+                            '(default: md5,sha1,sha256)')
+    parser.add_argument('--index-dir', metavar='DIR',
+                       help='Where --build-index writes indexes (default: next to the wordlist, '
+                            f'or {DigestIndex.DEFAULT_DIR} if that is not writable)')
+    parser.add_argument('--index', action='append', default=[], metavar='INDEX',
+                       help='Look targets up in a digest index built with --build-index')
+    parser.add_argument('--status-interval', type=float, default=5.0, metavar='SECONDS',
+                       help='Seconds between status lines with speed, progress and ETA '
+                            '(default: 5, 0 disables them)')
+    parser.add_argument('--status-json', metavar='FILE',
+                       help='Also keep the latest status in this JSON file, for dashboards')
+    parser.add_argument('--benchmark', nargs='?', const='-', metavar='FILE',
+                       help='Time fixed workloads per algorithm and attack, print a JSON '
+                            'report (or write it to FILE) and exit; -j caps the scaling runs '
+                            '(default: all cores)')
     
     args = parser.parse_args()
     
+    if args.benchmark:
+        # Keep stdout clean when the report goes there
+        print(BANNER, file=sys.stderr if args.benchmark == '-' else sys.stdout)
+        # Unset means all cores here, unlike for attacks
+        max_workers = args.workers if args.workers else (os.cpu_count() or 1)
+        log = partial(print, file=sys.stderr)
+        report = Benchmark(max_workers, log=log).run()
+        if args.benchmark == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.benchmark, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"[+] Benchmark report written to {args.benchmark}")
+        return
+    
+    print(BANNER)
+    
+    state = None
+    if args.restore:
+        try:
+            state = Checkpoint.load(args.session)
+        except (OSError, ValueError) as e:
+            print(f"[-] Error: Cannot restore session: {e}")
+            sys.exit(1)
+        
+        # Resume with the original command line, keeping the session and
+        # status options. Resume points don't depend on the worker count,
+        # so -j given now (e.g. on other hardware) wins over the saved one.
+        keep = {'session', 'restore', 'checkpoint_interval', 'status_interval', 'status_json'}
+        if args.workers is not None:
+            keep.add('workers')
+        for key, value in state['args'].items():
+            if key not in keep:
+                setattr(args, key, value)
+    
+    if args.build_index:
+        if not args.wordlist:
+            parser.error('--build-index needs a wordlist (-w)')
+        algorithms = [algo.strip() for algo in args.build_index.split(',') if algo.strip()]
+        for algo in algorithms:
+            if algo not in HashCracker.ALGORITHMS:
+                parser.error(f"unsupported index algorithm: {algo}")
+        
+        print(f"\n[*] Indexing {args.wordlist} for {', '.join(algorithms)}...")
+        start_time = time.monotonic()
+        try:
+            built = DigestIndex.build(args.wordlist, algorithms, args.index_dir)
+        except OSError as e:
+            print(f"[-] Error: {e}")
+            sys.exit(1)
+        for algo, (path, count) in built.items():
+            print(f"[+] {algo.upper()}: {count:,} digests -> {path}")
+        print(f"[+] Done in {time.monotonic() - start_time:.1f}s")
+        return
+    
+    if not args.hash and not args.hash_file:
+        parser.error('a target hash or --hash-file is required')
+    
+    if args.workers is None:
+        args.workers = 1
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
     # Character sets
     charsets = {
         'lowercase': string.ascii_lowercase,
@@ -193,46 +2201,181 @@ def main():
         'all': string.ascii_letters + string.digits + string.punctuation
     }
     
+    checkpoint = Checkpoint(args.session, args.checkpoint_interval, args=vars(args))
+    cracker = None
+    status = None
+    
     try:
-        cracker = HashCracker(args.hash, args.algorithm)
-        print(f"\n[+] Target Hash: {args.hash}")
+        if state:
+            hashes = state['remaining'] or list(state['cracked'])
+            cracker = HashCracker(hashes[0], state['algorithm'])
+            cracker.load_checkpoint(state)
+            print(f"\n[*] Restored session from {args.session} "
+                  f"({state['attack']} at position {state['position']:,})")
+        else:
+            cracker = HashCracker(args.hash, args.algorithm, hash_file=args.hash_file)
+        cracker.checkpoint = checkpoint
+        
+        if not args.no_potfile:
+            cracker.potfile = Potfile(args.potfile)
+            known = cracker.check_potfile()
+            
+            if args.show:
+                for hash_hex, plaintext in cracker.cracked.items():
+                    print(f"{hash_hex}:{plaintext}")
+                return
+        elif args.show:
+            raise ValueError("--show needs the potfile")
+        
+        if cracker.total_targets > 1:
+            print(f"\n[+] Target Hashes: {cracker.total_targets:,} from {args.hash_file}")
+            if cracker.skipped:
+                print(f"[!] Skipped {cracker.skipped:,} malformed or mismatched lines")
+            if cracker.salted:
+                print(f"[+] Unique Salts: {len(cracker.salts):,}")
+        else:
+            print(f"\n[+] Target Hash: {cracker.target_hash}")
         print(f"[+] Algorithm: {cracker.algorithm.upper()}")
+        if cracker.potfile and known:
+            print(f"[+] Potfile: {known:,} already cracked")
+        
+        for index_path in args.index:
+            if cracker.found:
+                break
+            index = DigestIndex(index_path)
+            try:
+                hits = cracker.check_index(index)
+            finally:
+                index.close()
+            print(f"[+] Index {index_path}: {hits:,} found ({index.count:,} digests)")
+        
+        if args.markov and not cracker.markov and (args.mask or args.bruteforce):
+            if args.markov == 'potfile':
+                if not cracker.potfile:
+                    raise ValueError("--markov potfile needs the potfile")
+                cracker.markov = PositionModel.from_potfile(cracker.potfile,
+                                                            args.markov_threshold)
+            else:
+                cracker.markov = PositionModel.from_wordlist(args.markov, args.markov_threshold)
+            print(f"[+] Markov: {len(cracker.markov.counts)} positions trained from {args.markov}")
         print("=" * 50)
         
-        result = None
+        result = cracker.plaintext if cracker.found else None
+        
+        # Attacks before the restored one already finished, the restored one
+        # picks up from its saved position
+        attack_order = ['dictionary', 'rules', 'combinator', 'hybrid', 'mask', 'bruteforce']
+        resume_attack = state['attack'] if state else 'dictionary'
+        resume_index = attack_order.index(resume_attack)
+        
+        def start_of(attack: str) -> int:
+            return state['position'] if state and attack == resume_attack else 0
+        
+        if args.status_interval > 0 and not result:
+            status = StatusReporter(cracker, args.status_interval, args.status_json).start()
         
         # Dictionary attack
-        if args.wordlist:
+        if not result and args.wordlist and resume_index <= attack_order.index('dictionary'):
             print(f"\n[*] Starting dictionary attack with: {args.wordlist}")
-            result = cracker.dictionary_attack(args.wordlist, progress_callback)
+            if workers > 1:
+                print(f"[*] Workers: {workers}")
+            result = cracker.dictionary_attack(args.wordlist, workers=workers,
+                                               start=start_of('dictionary'))
         
         # Rule-based attack
-        if not result and args.rules and args.wordlist:
+        if not result and args.rules and args.wordlist and \
+                resume_index <= attack_order.index('rules'):
             print("\n[*] Starting rule-based attack...")
-            rules = ['capitalize', 'uppercase', 'leet', 'reverse',
-                    'append_123', 'append_!', 'year_2024', 'year_2025']
-            with open(args.wordlist, 'r', errors='ignore') as f:
-                words = [line.strip() for line in f][:10000]
-            result = cracker.rule_attack(words, rules)
+            if args.rules is True:
+                rules = DEFAULT_RULES
+            else:
+                rules, skipped = load_rules(args.rules)
+                print(f"[*] Rules: {len(rules):,} from {args.rules}")
+                if skipped:
+                    print(f"[!] Skipped {skipped:,} unsupported rules")
+            result = cracker.rule_attack(args.wordlist, rules, start=start_of('rules'),
+                                         bloom_size=int(args.rule_bloom * (1 << 20)))
+        
+        # Combinator attack
+        if not result and args.combinator and args.wordlist and \
+                resume_index <= attack_order.index('combinator'):
+            print(f"\n[*] Starting combinator attack: {args.wordlist} x {args.combinator}")
+            if args.separator:
+                print(f"[*] Separator: {args.separator!r}")
+            result = cracker.combinator_attack(args.wordlist, args.combinator, args.separator,
+                                               workers=workers, start=start_of('combinator'))
+        
+        custom = {}
+        for i in range(1, 5):
+            spec = getattr(args, f'custom_charset{i}')
+            if spec:
+                custom[str(i)] = expand_charset(spec)
+        
+        # Hybrid attack
+        if not result and args.hybrid and args.wordlist and \
+                resume_index <= attack_order.index('hybrid'):
+            keyspace = Keyspace.from_mask(args.hybrid, custom, args.increment)
+            side = 'mask + word' if args.hybrid_left else 'word + mask'
+            print(f"\n[*] Starting hybrid attack ({side}): {args.wordlist} {args.hybrid}")
+            print(f"[*] Candidates per word: {keyspace.size:,}")
+            result = cracker.hybrid_attack(args.wordlist, args.hybrid, custom, args.hybrid_left,
+                                           args.increment, workers=workers,
+                                           start=start_of('hybrid'))
+        
+        # Mask attack
+        if not result and args.mask and resume_index <= attack_order.index('mask'):
+            keyspace = Keyspace.from_mask(args.mask, custom, args.increment)
+            if cracker.markov:
+                keyspace = keyspace.reorder(cracker.markov)
+            print(f"\n[*] Starting mask attack: {args.mask}")
+            print(f"[*] Keyspace: {keyspace.size:,}")
+            result = cracker.mask_attack(args.mask, custom, args.increment,
+                                         workers=workers, start=start_of('mask'))
         
         # Brute force
         if not result and args.bruteforce:
             charset = charsets[args.charset]
+            keyspace = Keyspace.from_charset(charset, args.min_len, args.max_len)
+            if cracker.markov:
+                keyspace = keyspace.reorder(cracker.markov)
             print(f"\n[*] Starting brute force (length {args.min_len}-{args.max_len})...")
             print(f"[*] Character set: {args.charset} ({len(charset)} chars)")
-            result = cracker.brute_force(charset, args.min_len, args.max_len, progress_callback)
+            print(f"[*] Keyspace: {keyspace.size:,}")
+            result = cracker.brute_force(charset, args.min_len, args.max_len,
+                                         workers=workers, start=start_of('bruteforce'))
+        
+        checkpoint.remove()
+        if status:
+            status.stop()
         
         print("\n" + "=" * 50)
-        if result:
+        if cracker.total_targets > 1:
+            print(f"[+] Cracked {len(cracker.cracked):,}/{cracker.total_targets:,} hashes")
+            for hash_hex, plaintext in cracker.cracked.items():
+                print(f"    {hash_hex}:{plaintext}")
+            print(f"[+] Attempts: {cracker.attempts:,}")
+        elif result:
             print(f"[+] PASSWORD FOUND!")
-            print(f"[+] Hash: {args.hash}")
+            print(f"[+] Hash: {cracker.target_hash}")
             print(f"[+] Plaintext: {result}")
             print(f"[+] Attempts: {cracker.attempts:,}")
         else:
             print(f"[-] Password not found")
             print(f"[-] Attempts: {cracker.attempts:,}")
         
-    except ValueError as e:
+    except KeyboardInterrupt:
+        if status:
+            status.stop()
+        if cracker:
+            cracker.save_checkpoint()
+        if cracker and cracker.resume_point:
+            print(f"\n[!] Interrupted, session saved to {args.session} (resume with --restore)")
+        else:
+            print("\n[!] Interrupted")
+        sys.exit(130)
+    except (ValueError, OSError) as e:
+        if status:
+            status.stop()
         print(f"[-] Error: {e}")
         sys.exit(1)
 
@@ -5,12 +5,27 @@ High-performance port scanner with service detection
 Part of the NullSec Tools Collection
 """
 
+import os
 import sys
+import ssl
+import time
+import errno
 import socket
+import struct
 import asyncio
+import bisect
+import hashlib
 import argparse
+import ipaddress
+import json
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional, Union
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 BANNER = r"""
 ╔═══════════════════════════════════════════════════════════════╗
@@ -35,69 +50,931 @@ COMMON_PORTS = {
     8443: 'HTTPS-Alt', 27017: 'MongoDB', 6667: 'IRC', 9200: 'Elasticsearch'
 }
 
+# UDP services, used for -sU port names and for "common"
+UDP_SERVICES = {
+    53: 'DNS', 67: 'DHCP', 69: 'TFTP', 123: 'NTP', 137: 'NetBIOS-NS',
+    138: 'NetBIOS-DGM', 161: 'SNMP', 162: 'SNMP-Trap', 500: 'IKE', 514: 'Syslog',
+    1900: 'SSDP', 5353: 'mDNS', 11211: 'Memcached'
+}
+
+DNS_QUERY = bytes.fromhex('123401000001000000000000' '0000020001')  # ". IN NS"
+
+# UDP probes keyed like COMMON_PORTS. Most UDP services ignore a datagram
+# they can't parse, so a generic one would make them look filtered.
+UDP_PAYLOADS = {
+    53: DNS_QUERY,
+    5353: DNS_QUERY,
+    69: b"\x00\x01nullsec\x00octet\x00",  # TFTP read request, answered with an error
+    123: b"\xe3" + b"\x00" * 47,  # NTPv4 client request
+    137: bytes.fromhex('80f00010000100000000000020') + b"CK" + b"A" * 30 + bytes.fromhex('0000210001'),
+    161: bytes.fromhex('302902010004067075626c6963a01c02044e754c4c020100020100'
+                       '300e300c06082b060102010101000500'),  # SNMPv1 get sysDescr.0, "public"
+    1900: (b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\n"
+           b"MAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n"),
+    11211: b"\x00\x01\x00\x00\x00\x01\x00\x00version\r\n",
+}
+# For every other port. Not empty: asyncio (before 3.12) silently drops
+# empty datagrams.
+UDP_DEFAULT_PAYLOAD = b"\x00"
+
+# Default send rate for UDP scans: most stacks rate-limit ICMP port
+# unreachables (Linux to about 1000/s), and a lost one reads as open|filtered
+UDP_RATE = 500
+
+HTTP_PROBE = b"HEAD / HTTP/1.0\r\n\r\n"
+
+# Banner probes keyed like COMMON_PORTS, for services that wait for the
+# client. Anything else is read passively first (SSH, FTP, SMTP, POP3,
+# IMAP, MySQL, VNC... greet on connect), then sent HTTP_PROBE.
+BANNER_PROBES = {
+    80: HTTP_PROBE, 443: HTTP_PROBE, 8080: HTTP_PROBE, 8443: HTTP_PROBE, 9200: HTTP_PROBE,
+    6379: b"PING\r\n",
+}
+
+# Ports that only talk after a TLS handshake
+TLS_PORTS = {443, 993, 995, 8443}
+
+# How often the scan checks how late the event loop runs its callbacks.
+# A busy loop delays both issuing connects and noticing their answers,
+# and that delay must not be mistaken for network RTT or loss.
+LAG_INTERVAL = 0.01
+LAG_DECAY = 0.9
+
+# Concurrent DNS lookups while resolving targets
+RESOLVE_CONCURRENCY = 64
+
+# File descriptors kept free for everything that isn't a probe socket
+FD_RESERVE = 64
+
+# Connect errors caused by this machine running out of something (fds,
+# ephemeral ports, buffers), as opposed to an answer from the target
+LOCAL_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.EADDRNOTAVAIL, errno.ENOBUFS, errno.ENOMEM}
+UNREACHABLE_ERRNOS = {errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EHOSTDOWN, errno.ENETDOWN}
+
+# A probe hitting local errors backs off and tries again this many times
+LOCAL_RETRIES = 10
+LOCAL_BACKOFF = 0.05
+
+# SYN scan: TCP flags, and the MSS option every real SYN carries
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+SYN_OPTIONS = struct.pack('!BBH', 2, 4, 1460)
+SYN_WINDOW = 1024
+# Probes sent between yields to the event loop, so replies are drained while sending
+SYN_BURST = 256
+# Receive buffer for replies, forced past rmem_max (we're root anyway)
+SYN_RCVBUF = 8 << 20
+SO_RCVBUFFORCE = 33
+
+
+def expand_targets(specs: Iterable[str]) -> Iterator[str]:
+    """Split comma-separated target lists into single hosts, IPs and CIDR ranges"""
+    for spec in specs:
+        for target in spec.split(','):
+            target = target.strip()
+            if target:
+                yield target
+
+
+def read_target_file(path: str) -> List[str]:
+    """Targets from a file, one or more per line, # starts a comment"""
+    targets = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                targets.extend(line.split())
+    return targets
+
+
+def raise_fd_limit(wanted: int) -> int:
+    """Raise the soft RLIMIT_NOFILE towards wanted (up to the hard limit), returns the limit"""
+    if resource is None:
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY or soft >= wanted:
+        return wanted
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        return target
+    except (ValueError, OSError):
+        return soft
+
+
+def tcp_checksum(data: bytes) -> int:
+    """Internet checksum (RFC 1071) over a pseudo-header and TCP segment"""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def route_source(host: str) -> bytes:
+    """Local address the kernel sends from to reach host, needed for the TCP checksum"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((host, 9))
+        return socket.inet_aton(s.getsockname()[0])
+
+
+class SynEngine:
+    """Stateless SYN probes over a raw socket (Linux, root only)
+    
+    Nothing is kept per probe: the initial sequence number is a keyed
+    hash of the destination, so a SYN-ACK or RST is matched to its probe
+    by the acknowledgment number it carries. The kernel answers SYN-ACKs
+    with a RST itself, since no socket owns the connection.
+    """
+    
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("SYN scan needs Linux raw sockets")
+        # IPPROTO_TCP raw sockets get a copy of every inbound TCP packet
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        self.sock.setblocking(False)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, SYN_RCVBUF)
+        except OSError:
+            pass
+        self.key = os.urandom(16)
+        self.sport = 40000 + int.from_bytes(os.urandom(2), 'big') % 20000
+    
+    def close(self):
+        self.sock.close()
+    
+    async def writable(self):
+        """Wait until the socket's send buffer has room again"""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_writer(self.sock.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_writer(self.sock.fileno())
+    
+    def cookie(self, addr: bytes, port: int) -> int:
+        digest = hashlib.blake2b(addr + port.to_bytes(2, 'big'), key=self.key, digest_size=4)
+        return int.from_bytes(digest.digest(), 'big')
+    
+    def probe(self, host: str, port: int, src: bytes) -> bytes:
+        """TCP SYN segment for host:port sent from src, the kernel adds the IP header"""
+        dst = socket.inet_aton(host)
+        header = struct.pack('!HHIIBBHHH', self.sport, port, self.cookie(dst, port), 0,
+                             (20 + len(SYN_OPTIONS)) << 2, TCP_SYN, SYN_WINDOW, 0, 0) + SYN_OPTIONS
+        pseudo = src + dst + struct.pack('!BBH', 0, socket.IPPROTO_TCP, len(header))
+        return header[:16] + struct.pack('!H', tcp_checksum(pseudo + header)) + header[18:]
+    
+    def parse(self, packet: bytes) -> Optional[Tuple[bytes, int, bool]]:
+        """(address, port, open) for a reply to one of our probes, else None"""
+        ihl = (packet[0] & 0x0f) * 4
+        if len(packet) < ihl + 14:
+            return None
+        sport, dport, _, ack, _, flags = struct.unpack_from('!HHIIBB', packet, ihl)
+        if dport != self.sport or not flags & TCP_ACK:
+            return None
+        addr = packet[12:16]
+        if (ack - 1) & 0xffffffff != self.cookie(addr, sport):
+            return None
+        if flags & TCP_SYN:
+            return addr, sport, True
+        if flags & TCP_RST:
+            return addr, sport, False
+        return None
+
+
+class TokenBucket:
+    """Paces probe sends to rate per second, allowing bursts of up to burst
+    
+    Tokens may go negative: each caller takes one and sleeps off its own
+    debt, so waiters are released in order without polling. A rate of 0
+    disables pacing.
+    """
+    
+    def __init__(self, rate: float, burst: int = 0):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate / 20))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+    
+    async def acquire(self):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class UdpProbe(asyncio.DatagramProtocol):
+    """Connected UDP socket that waits for the first answer
+    
+    On a connected socket Linux reports an ICMP port unreachable as
+    ConnectionRefusedError (other ICMP errors as their own OSError),
+    which lands in error_received().
+    """
+    
+    def __init__(self):
+        self.answer = asyncio.get_running_loop().create_future()
+    
+    def datagram_received(self, data: bytes, addr):
+        if not self.answer.done():
+            self.answer.set_result(data)
+    
+    def error_received(self, exc: Exception):
+        if not self.answer.done():
+            self.answer.set_exception(exc)
+
+
+class NdjsonWriter:
+    """Appends results to a file as they're found, one JSON object per line
+    
+    Lines go through a write buffer that's flushed at most flush_interval
+    seconds after the oldest unflushed line (flush() can be called on a
+    timer to cover quiet spells), so a killed scan loses at most that
+    much and `tail -f` keeps up while it runs.
+    """
+    
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.file = open(path, 'a', buffering=1 << 16)
+        self.flush_interval = flush_interval
+        self.pending = 0
+        self.last_flush = time.monotonic()
+    
+    def write(self, record: Dict):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.pending += 1
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        if self.pending:
+            self.file.flush()
+            self.pending = 0
+        self.last_flush = time.monotonic()
+    
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+    
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class ProbeBitmap:
+    """One bit per (host, port) probe of a sweep, set once it's answered
+    
+    Bits are laid out in iter_targets() order: port by port, hosts in
+    iter_hosts() order. A reply's address is mapped back to its host
+    number by bisecting the networks' first addresses, so memory is one
+    bit per probe plus one entry per network.
+    """
+    
+    def __init__(self, networks: List, ports: List[int]):
+        spans = []
+        offset = 0
+        for network in networks:
+            size = PortScanner.network_size(network)
+            # hosts() skips the network address of wider ranges
+            first = int(network.network_address) + (1 if network.num_addresses > 2 else 0)
+            spans.append((first, size, offset))
+            offset += size
+        spans.sort()
+        self.spans = spans
+        self.starts = [first for first, _, _ in spans]
+        self.hosts = offset
+        self.ports = {port: i for i, port in enumerate(ports)}
+        self.bits = bytearray((self.hosts * len(ports) + 7) // 8)
+        self.count = 0
+    
+    def index(self, address: int, port: int) -> Optional[int]:
+        """Bit number of a probe, None if it isn't part of the sweep"""
+        i = bisect.bisect_right(self.starts, address) - 1
+        port_index = self.ports.get(port)
+        if i < 0 or port_index is None:
+            return None
+        first, size, offset = self.spans[i]
+        if address - first >= size:
+            return None
+        return port_index * self.hosts + offset + address - first
+    
+    def __contains__(self, index: int) -> bool:
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+    
+    def add(self, index: int) -> bool:
+        """Set a bit, returns False if it was already set"""
+        if index in self:
+            return False
+        self.bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+        return True
+
+
+class RttEstimator:
+    """Smoothed connect RTT and its variance, as TCP does for retransmissions (RFC 6298)"""
+    
+    __slots__ = ('srtt', 'rttvar')
+    
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = 0.0
+    
+    def update(self, rtt: float):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.ALPHA * (rtt - self.srtt)
+    
+    def timeout(self, minimum: float, maximum: float) -> float:
+        return min(maximum, max(minimum, self.srtt + 4 * self.rttvar))
+
+
+class AdaptiveLimiter:
+    """AIMD cap on in-flight connects, like a TCP congestion window
+    
+    Each clean answer grows the cap by 1/cap (about one per full window),
+    each sign of overload halves it, at most once per window so a burst
+    of errors from the same overload only counts once.
+    """
+    
+    def __init__(self, maximum: int, minimum: int = 8):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self.since_decrease = self.maximum
+        self._condition = None
+    
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created on first use: before 3.10 it binds to the loop current at
+        # creation, and the scanner is built before asyncio.run() starts one
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+    
+    async def __aexit__(self, *exc):
+        async with self.condition:
+            self.in_flight -= 1
+            self.since_decrease += 1
+            self.condition.notify(max(1, int(self.limit) - self.in_flight))
+    
+    def success(self):
+        if self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+    
+    def congestion(self):
+        if self.since_decrease >= self.limit:
+            self.limit = max(self.minimum, self.limit / 2)
+            self.since_decrease = 0
+
+
 class PortScanner:
     """Async port scanner with service detection"""
     
-    def __init__(self, target: str, timeout: float = 1.0, concurrency: int = 500):
-        self.target = target
+    def __init__(self, target: Union[str, List[str]], timeout: float = 1.0,
+                 concurrency: int = 500, banner_concurrency: int = 100,
+                 banner_timeout: float = 1.0, min_timeout: float = 0.25, retries: int = 1,
+                 syn: bool = False, keep_results: bool = True, udp: bool = False,
+                 rate: float = 0):
+        # Target specs: hostnames, IPs or CIDR ranges, resolved by resolve()
+        self.targets = [target] if isinstance(target, str) else list(target)
+        # Connect timeouts adapt per host between min_timeout and timeout
         self.timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.retries = retries
+        # Half-open raw SYN sweep instead of full connects (root only)
+        self.syn = syn
+        # UDP probes with service payloads instead of TCP
+        self.udp = udp
+        # Probe sends per second across the whole scan, 0 for no limit
+        self.bucket = TokenBucket(rate)
+        self.rtt: Dict[str, RttEstimator] = {}
+        self.global_rtt = RttEstimator()
+        # Recent event loop lag, added on top of adaptive timeouts
+        self.loop_lag = 0.0
         self.concurrency = concurrency
+        self.limiter = AdaptiveLimiter(concurrency)
+        # Probe outcomes: open, closed, filtered, unreachable, error, local_errors, retries
+        self.stats: Counter = Counter()
+        # Banner grabbing runs as its own stage, 0 skips it
+        self.banner_concurrency = banner_concurrency
+        self.banner_timeout = banner_timeout
+        # Results also go to the report() callback as they're found, so
+        # streaming callers can skip holding them all
+        self.keep_results = keep_results
         self.open_ports: List[Dict] = []
+        self.started = time.monotonic()
         
-    async def scan_port(self, port: int) -> Tuple[int, bool, str]:
-        """Scan a single port"""
-        try:
-            conn = asyncio.open_connection(self.target, port)
-            reader, writer = await asyncio.wait_for(conn, timeout=self.timeout)
-            
-            # Try to grab banner
-            banner = ""
+        # Resolved hosts are kept as networks (a single address is a /32 or
+        # /128) so a large range is never expanded into a list up front
+        self.networks: List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]] = []
+        self.hostnames: Dict[str, str] = {}
+        self.unresolved: List[str] = []
+    
+    async def resolve(self) -> int:
+        """Resolve every target once, returns the number of hosts to scan"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+        
+        async def lookup(name: str):
+            async with semaphore:
+                try:
+                    infos = await loop.getaddrinfo(name, None, type=socket.SOCK_STREAM)
+                except (socket.gaierror, UnicodeError):
+                    return None
+            # Prefer IPv4 like gethostbyname, fall back to whatever resolved
+            infos.sort(key=lambda info: info[0] != socket.AF_INET)
+            return infos[0][4][0]
+        
+        networks = []
+        names = []
+        for target in expand_targets(self.targets):
             try:
-                writer.write(b"HEAD / HTTP/1.0\r\n\r\n")
-                await writer.drain()
-                data = await asyncio.wait_for(reader.read(1024), timeout=1.0)
-                banner = data.decode('utf-8', errors='ignore').strip()[:100]
-            except:
-                pass
+                networks.append(ipaddress.ip_network(target, strict=False))
+            except ValueError:
+                names.append(target)
+        
+        addresses = await asyncio.gather(*(lookup(name) for name in names))
+        for name, address in zip(names, addresses):
+            if address is None:
+                self.unresolved.append(name)
+                continue
+            networks.append(ipaddress.ip_network(address))
+            self.hostnames.setdefault(address, name)
+        
+        self.networks = self.dedupe(networks)
+        return self.host_count
+    
+    @classmethod
+    def dedupe(cls, networks: List) -> List:
+        """Drop hosts listed twice, by name and address, or inside a listed range"""
+        ranges = sorted((network for network in networks if network.num_addresses > 1),
+                        key=lambda network: (network.version, network.network_address,
+                                             network.prefixlen))
+        # CIDR ranges either nest or don't overlap, so after sorting a range
+        # is either inside the last one kept or starts past it
+        kept = []
+        for network in ranges:
+            if kept and kept[-1].version == network.version and network.subnet_of(kept[-1]):
+                continue
+            kept.append(network)
+        
+        starts = [(network.version, int(network.network_address)) for network in kept]
+        singles = []
+        for network in dict.fromkeys(network for network in networks
+                                     if network.num_addresses == 1):
+            address = network.network_address
+            i = bisect.bisect_right(starts, (address.version, int(address))) - 1
+            if i < 0 or not cls.covers(kept[i], address):
+                singles.append(network)
+        return kept + singles
+    
+    @staticmethod
+    def covers(network, address) -> bool:
+        """Whether hosts() of a range includes an address"""
+        if network.version != address.version or address not in network:
+            return False
+        if network.num_addresses <= 2:
+            return True
+        if address == network.network_address:
+            return False
+        return network.version == 6 or address != network.broadcast_address
+    
+    @property
+    def host_count(self) -> int:
+        return sum(self.network_size(network) for network in self.networks)
+    
+    @staticmethod
+    def network_size(network) -> int:
+        # Like hosts(): wider ranges leave out the network address, and the
+        # broadcast address on IPv4
+        if network.num_addresses <= 2:
+            return network.num_addresses
+        return network.num_addresses - (2 if network.version == 4 else 1)
+    
+    def iter_hosts(self) -> Iterator[str]:
+        for network in self.networks:
+            for address in network.hosts():
+                yield str(address)
+    
+    def iter_targets(self, ports: List[int]) -> Iterator[Tuple[str, int]]:
+        """Every (host, port) pair, port by port, so each host sees one probe at a time
+        
+        Interleaving hosts spreads the shared concurrency budget across the
+        whole range instead of hammering one host with every port at once.
+        """
+        for port in ports:
+            for host in self.iter_hosts():
+                yield host, port
+    
+    def connect_timeout(self, host: str) -> float:
+        """Timeout from the host's measured RTTs, else the whole scan's, else the maximum
+        
+        Twice the current event loop lag is added on top: an answer that
+        arrived in time can still wait that long for the loop to get to it.
+        """
+        estimator = self.rtt.get(host)
+        if estimator is None:
+            if self.global_rtt.srtt is None:
+                return self.timeout
+            estimator = self.global_rtt
+        return min(self.timeout, estimator.timeout(self.min_timeout, self.timeout) + 2 * self.loop_lag)
+    
+    async def watch_loop_lag(self):
+        """Keep loop_lag up to date: spikes are taken at once and decay slowly"""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = time.monotonic() - start - LAG_INTERVAL
+            self.loop_lag = max(lag, self.loop_lag * LAG_DECAY)
+    
+    def add_rtt_sample(self, host: str, rtt: float):
+        if host not in self.rtt:
+            self.rtt[host] = RttEstimator()
+        self.rtt[host].update(rtt)
+        self.global_rtt.update(rtt)
+    
+    async def scan_port(self, host: str, port: int) -> bool:
+        """Check whether a port accepts connections
+        
+        Only a timeout cut short by an adaptive timeout is ambiguous (the
+        reply may just be slower than the estimate, or lost); it's retried
+        with the timeout doubled, up to the maximum. If the retry is then
+        answered faster than the first timeout, the first probe (or its
+        answer) was lost rather than late, which shrinks the in-flight
+        limit just like local errors do. A retry answered slower only
+        means the estimate was tight, which says nothing about load.
+        """
+        timeout = self.connect_timeout(host)
+        retries = self.retries
+        first_timeout = None
+        local_errors = 0
+        
+        while True:
+            async with self.limiter:
+                state, rtt = await self.connect(host, port, timeout)
             
-            writer.close()
-            await writer.wait_closed()
+            if state == 'local':
+                # Nothing was learned about the target, try the probe again
+                self.stats['local_errors'] += 1
+                self.limiter.congestion()
+                local_errors += 1
+                if local_errors > LOCAL_RETRIES:
+                    self.stats['error'] += 1
+                    return False
+                await asyncio.sleep(LOCAL_BACKOFF * local_errors)
+                continue
             
-            return (port, True, banner)
-        except:
-            return (port, False, "")
+            if state == 'timeout':
+                if retries and timeout < self.timeout:
+                    retries -= 1
+                    if first_timeout is None:
+                        first_timeout = timeout
+                    self.stats['retries'] += 1
+                    timeout = min(self.timeout, timeout * 2)
+                    continue
+                self.stats['filtered'] += 1
+                return False
+            
+            if first_timeout is not None:
+                if rtt is not None and rtt < first_timeout:
+                    self.limiter.congestion()
+            elif state != 'error':
+                self.limiter.success()
+            self.stats[state] += 1
+            return state == 'open'
+    
+    async def connect(self, host: str, port: int, timeout: float) -> Tuple[str, Optional[float]]:
+        """One connect attempt, returns its state and the RTT of any answer
+        
+        The state is 'open', 'closed' (refused), 'unreachable' (ICMP),
+        'timeout', 'local' when this machine ran out of fds, ports or
+        buffers, or 'error' for anything else.
+        """
+        start = None
+        
+        async def open_connection():
+            nonlocal start
+            # wait_for runs this as a new task, which may sit in the loop's
+            # queue for a while: time from when the connect is really issued
+            start = time.monotonic()
+            return await asyncio.open_connection(host, port)
+        
+        try:
+            reader, writer = await asyncio.wait_for(open_connection(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return 'timeout', None
+        except ConnectionRefusedError:
+            # A RST is as good an RTT sample as a SYN-ACK
+            rtt = time.monotonic() - start
+            self.add_rtt_sample(host, rtt)
+            return 'closed', rtt
+        except OSError as e:
+            if e.errno in LOCAL_ERRNOS:
+                return 'local', None
+            if e.errno in UNREACHABLE_ERRNOS:
+                return 'unreachable', None
+            return 'error', None
+        
+        rtt = time.monotonic() - start
+        self.add_rtt_sample(host, rtt)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return 'open', rtt
+    
+    async def grab_banner(self, host: str, port: int) -> str:
+        """Reconnect to an open port and read what it says
+        
+        Ports with a probe in BANNER_PROBES get it straight away. Anything
+        else gets a passive read first, since many services greet on
+        connect, then the HTTP probe if it stayed quiet.
+        """
+        context = None
+        if port in TLS_PORTS:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        
+        try:
+            # SNI with the name the host was given by, if any
+            server_hostname = self.hostnames.get(host) if context else None
+            conn = asyncio.open_connection(host, port, ssl=context,
+                                           server_hostname=server_hostname)
+            reader, writer = await asyncio.wait_for(conn,
+                                                    timeout=self.timeout + self.banner_timeout)
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            return ""
+        
+        data = b""
+        try:
+            probe = BANNER_PROBES.get(port)
+            if probe is None:
+                try:
+                    data = await asyncio.wait_for(reader.read(1024), timeout=self.banner_timeout)
+                except asyncio.TimeoutError:
+                    probe = HTTP_PROBE
+            if probe and not data:
+                writer.write(probe)
+                await writer.drain()
+                data = await asyncio.wait_for(reader.read(1024), timeout=self.banner_timeout)
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+        
+        return data.decode('utf-8', errors='ignore').strip()[:100]
     
     async def scan_ports(self, ports: List[int], callback=None) -> List[Dict]:
-        """Scan multiple ports concurrently"""
-        semaphore = asyncio.Semaphore(self.concurrency)
+        """Scan multiple ports on every resolved host under one concurrency budget
         
-        async def bounded_scan(port: int):
-            async with semaphore:
-                return await self.scan_port(port)
-        
-        tasks = [bounded_scan(port) for port in ports]
-        results = await asyncio.gather(*tasks)
-        
-        for port, is_open, banner in results:
-            if is_open:
-                service = COMMON_PORTS.get(port, 'Unknown')
-                result = {
-                    'port': port,
-                    'state': 'open',
-                    'service': service,
-                    'banner': banner
-                }
-                self.open_ports.append(result)
-                if callback:
-                    callback(result)
+        A fixed pool of connect workers pulls (host, port) pairs from one
+        lazy generator, so memory stays flat however large the scan. Open
+        ports are queued for a separate, independently sized pool of
+        banner workers, so slow banner reads never hold up the sweep.
+        """
+        if not self.networks:
+            await self.resolve()
+        self.started = time.monotonic()
+        targets = self.iter_targets(ports)
+        found: asyncio.Queue = asyncio.Queue()
         
+        def found_open(host: str, port: int):
+            if self.banner_concurrency:
+                found.put_nowait((host, port))
+            else:
+                self.report(host, port, "", callback)
+        
+        async def connect_worker():
+            # The generator is shared: each next() hands out a distinct pair
+            for host, port in targets:
+                if self.udp:
+                    # The reply is the banner, no second stage needed
+                    reply = await self.scan_udp_port(host, port)
+                    if reply is not None:
+                        self.report(host, port, udp_banner(reply), callback)
+                elif await self.scan_port(host, port):
+                    found_open(host, port)
+        
+        async def banner_worker():
+            while True:
+                item = await found.get()
+                if item is None:
+                    return
+                host, port = item
+                self.report(host, port, await self.grab_banner(host, port), callback)
+        
+        banner_workers = [asyncio.create_task(banner_worker())
+                          for _ in range(0 if self.udp else self.banner_concurrency)]
+        workers = min(self.concurrency, self.host_count * len(ports))
+        lag_watcher = asyncio.create_task(self.watch_loop_lag())
+        try:
+            if self.syn:
+                await self.syn_sweep(ports, found_open)
+            else:
+                await asyncio.gather(*(connect_worker() for _ in range(workers)))
+            for _ in banner_workers:
+                found.put_nowait(None)
+            await asyncio.gather(*banner_workers)
+        finally:
+            lag_watcher.cancel()
+            for task in banner_workers:
+                task.cancel()
         return self.open_ports
     
+    async def syn_sweep(self, ports: List[int], found_open):
+        """Sweep every target with raw SYN probes, calling found_open(host, port)
+        
+        The first pass sends every probe; each retry pass resends only the
+        ones that got no answer within the timeout, tracked one bit per
+        probe. Replies are read by a reader callback on the same loop as
+        they arrive, so sending never waits on any single port.
+        Unanswered probes count as filtered.
+        """
+        if any(network.version != 4 for network in self.networks):
+            raise ValueError("SYN scan supports IPv4 targets only")
+        engine = SynEngine()
+        loop = asyncio.get_running_loop()
+        answered = ProbeBitmap(self.networks, ports)
+        # Routes are looked up once per target network: per probe it's a
+        # syscall round trip that costs more than building the SYN
+        sources = [route_source(str(next(iter(network.hosts())))) for network in self.networks]
+        
+        def hosts_and_sources() -> Iterator[Tuple[str, bytes]]:
+            # iter_hosts() order, which the bitmap is numbered in
+            for network, source in zip(self.networks, sources):
+                for address in network.hosts():
+                    yield str(address), source
+        
+        def on_readable():
+            while True:
+                try:
+                    packet = engine.sock.recv(65535)
+                except (BlockingIOError, InterruptedError):
+                    return
+                reply = engine.parse(packet)
+                if reply is None:
+                    continue
+                addr, port, is_open = reply
+                index = answered.index(int.from_bytes(addr, 'big'), port)
+                # Targets resend SYN-ACKs that we (well, the kernel) never ACK
+                if index is None or not answered.add(index):
+                    continue
+                self.stats['open' if is_open else 'closed'] += 1
+                if is_open:
+                    found_open(socket.inet_ntoa(addr), port)
+        
+        loop.add_reader(engine.sock.fileno(), on_readable)
+        try:
+            for attempt in range(self.retries + 1):
+                sent = 0
+                # iter_targets() order, numbered to match the bitmap
+                for port_index, port in enumerate(ports):
+                    base = port_index * answered.hosts
+                    for host_index, (host, source) in enumerate(hosts_and_sources()):
+                        if base + host_index in answered:
+                            continue
+                        await self.send_syn(engine, host, port, source)
+                        sent += 1
+                        if sent % SYN_BURST == 0:
+                            await asyncio.sleep(0)
+                if not sent:
+                    break
+                if attempt:
+                    self.stats['retries'] += sent
+                await asyncio.sleep(self.timeout)
+        finally:
+            loop.remove_reader(engine.sock.fileno())
+            engine.close()
+        self.stats['filtered'] += self.host_count * len(ports) - answered.count
+    
+    async def send_syn(self, engine: SynEngine, host: str, port: int, source: bytes):
+        """Send one probe, backing off while the kernel is out of buffers"""
+        packet = engine.probe(host, port, source)
+        await self.bucket.acquire()
+        attempt = 0
+        while attempt < LOCAL_RETRIES:
+            try:
+                engine.sock.sendto(packet, (host, 0))
+                return
+            except BlockingIOError:
+                await engine.writable()
+                continue
+            except OSError as e:
+                if e.errno not in LOCAL_ERRNOS:
+                    # Unroutable: the probe goes unanswered and counts as filtered
+                    self.stats['error'] += 1
+                    return
+                self.stats['local_errors'] += 1
+                attempt += 1
+                await asyncio.sleep(LOCAL_BACKOFF * attempt)
+        self.stats['error'] += 1
+    
+    async def scan_udp_port(self, host: str, port: int) -> Optional[bytes]:
+        """Send the port's UDP payload, returns the reply if the port answered
+        
+        A port unreachable means closed. Silence can't tell open from
+        filtered (or from an ICMP error the target rate-limited away), so
+        the probe is resent up to retries times, each send paced by the
+        token bucket, before it's counted as open|filtered.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, LOCAL_RETRIES + 1):
+            try:
+                async with self.limiter:
+                    transport, probe = await loop.create_datagram_endpoint(
+                        UdpProbe, remote_addr=(host, port))
+                break
+            except OSError as e:
+                if e.errno not in LOCAL_ERRNOS:
+                    self.stats['error'] += 1
+                    return None
+                self.stats['local_errors'] += 1
+                self.limiter.congestion()
+                await asyncio.sleep(LOCAL_BACKOFF * attempt)
+        else:
+            self.stats['error'] += 1
+            return None
+        
+        payload = UDP_PAYLOADS.get(port, UDP_DEFAULT_PAYLOAD)
+        try:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.stats['retries'] += 1
+                await self.bucket.acquire()
+                start = time.monotonic()
+                transport.sendto(payload)
+                try:
+                    # Shielded so a timeout doesn't cancel the answer retries wait on
+                    reply = await asyncio.wait_for(asyncio.shield(probe.answer), self.timeout)
+                except asyncio.TimeoutError:
+                    continue
+                except ConnectionRefusedError:
+                    self.add_rtt_sample(host, time.monotonic() - start)
+                    self.stats['closed'] += 1
+                    return None
+                except OSError as e:
+                    self.stats['unreachable' if e.errno in UNREACHABLE_ERRNOS else 'error'] += 1
+                    return None
+                self.add_rtt_sample(host, time.monotonic() - start)
+                self.stats['open'] += 1
+                return reply
+            self.stats['filtered'] += 1
+            return None
+        finally:
+            transport.close()
+    
+    def report(self, host: str, port: int, banner: str, callback=None):
+        """Record an open port and hand it to the callback straight away"""
+        service = (UDP_SERVICES if self.udp else COMMON_PORTS).get(port, 'Unknown')
+        estimator = self.rtt.get(host)
+        result = {
+            'host': host,
+            'hostname': self.hostnames.get(host, ''),
+            'port': port,
+            'protocol': 'udp' if self.udp else 'tcp',
+            'state': 'open',
+            'service': service,
+            'banner': banner,
+            'time': datetime.now().isoformat(),
+            # Seconds into the scan, and the host's smoothed connect RTT
+            'elapsed': round(time.monotonic() - self.started, 3),
+            'rtt_ms': round(estimator.srtt * 1000, 2) if estimator else None
+        }
+        if self.keep_results:
+            self.open_ports.append(result)
+        if callback:
+            callback(result)
+    
     def get_port_range(self, port_spec: str) -> List[int]:
         """Parse port specification"""
         ports = []
         
-        if port_spec == 'common':
+        if port_spec == 'common' and self.udp:
+            return list(UDP_SERVICES.keys())
+        elif port_spec == 'common':
             return list(COMMON_PORTS.keys())
         elif port_spec == 'all':
             return list(range(1, 65536))
@@ -116,45 +993,124 @@ class PortScanner:
         return sorted(set(ports))
 
 
+def udp_banner(data: bytes) -> str:
+    """Printable text of a UDP reply, most are binary"""
+    text = data.decode('latin-1')
+    return ''.join(ch if ch.isprintable() or ch in '\r\n' else '.' for ch in text).strip()[:100]
+
+
 def print_result(result: Dict):
     """Print scan result as it comes in"""
     banner_info = f" | {result['banner'][:50]}" if result['banner'] else ""
-    print(f"  [OPEN] {result['port']:>5}/tcp  {result['service']:<15}{banner_info}")
+    print(f"  [OPEN] {result['host']:<15} {result['port']:>5}/{result['protocol']}  "
+          f"{result['service']:<15}{banner_info}")
 
 
 async def main_async(args):
     """Main async function"""
+    # Every in-flight connect and banner grab holds a socket
+    wanted = args.concurrency + args.banner_concurrency + FD_RESERVE
+    fd_limit = raise_fd_limit(wanted)
+    if fd_limit < wanted:
+        args.concurrency = max(1, fd_limit - args.banner_concurrency - FD_RESERVE)
+        print(f"[!] Open file limit is {fd_limit}, concurrency lowered to {args.concurrency}")
+    
     scanner = PortScanner(
-        target=args.target,
+        target=args.targets,
         timeout=args.timeout,
-        concurrency=args.concurrency
+        concurrency=args.concurrency,
+        banner_concurrency=args.banner_concurrency,
+        banner_timeout=args.banner_timeout,
+        min_timeout=args.min_timeout,
+        retries=args.retries,
+        syn=args.syn,
+        udp=args.udp,
+        rate=args.rate,
+        # Only the -o summary needs every result in memory
+        keep_results=bool(args.output)
     )
     
     ports = scanner.get_port_range(args.ports)
+    hosts = await scanner.resolve()
+    for name in scanner.unresolved:
+        print(f"[-] Warning: Cannot resolve hostname '{name}'")
+    if not hosts:
+        print("[-] Error: No targets to scan")
+        sys.exit(1)
+    if args.syn and any(network.version != 4 for network in scanner.networks):
+        print("[-] Error: SYN scan supports IPv4 targets only")
+        sys.exit(1)
     
-    print(f"\n[+] Target: {args.target}")
+    print(f"\n[+] Target: {', '.join(scanner.targets[:5])}"
+          f"{f' (+{len(scanner.targets) - 5} more)' if len(scanner.targets) > 5 else ''}")
+    print(f"[+] Hosts: {hosts}")
     print(f"[+] Ports: {len(ports)} ports to scan")
-    print(f"[+] Timeout: {args.timeout}s")
-    print(f"[+] Concurrency: {args.concurrency}")
+    if args.syn:
+        print(f"[+] Scan type: SYN (raw socket), {args.retries} retries")
+        print(f"[+] Timeout: {args.timeout}s per pass")
+    elif args.udp:
+        print(f"[+] Scan type: UDP, {args.retries} retries")
+        print(f"[+] Timeout: {args.timeout}s per probe")
+        print(f"[+] Concurrency: {args.concurrency}")
+    else:
+        print(f"[+] Scan type: Connect")
+        print(f"[+] Timeout: {args.min_timeout}-{args.timeout}s (adaptive)")
+        print(f"[+] Concurrency: {args.concurrency}")
+    if args.rate:
+        print(f"[+] Rate limit: {args.rate:g} probes/second")
     print(f"[+] Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     print("\nDiscovered Ports:")
     
+    writer = None
+    flusher = None
+    callback = print_result
+    if args.ndjson:
+        try:
+            writer = NdjsonWriter(args.ndjson, args.flush_interval)
+        except OSError as e:
+            print(f"[-] Error: Cannot open {args.ndjson}: {e}")
+            sys.exit(1)
+        flusher = asyncio.create_task(writer.flush_periodically())
+        
+        def callback(result: Dict):
+            print_result(result)
+            writer.write(result)
+    
     start_time = datetime.now()
-    results = await scanner.scan_ports(ports, callback=print_result)
+    try:
+        results = await scanner.scan_ports(ports, callback=callback)
+    except PermissionError:
+        print("[-] Error: SYN scan needs root (CAP_NET_RAW)")
+        sys.exit(1)
+    finally:
+        # Also runs on Ctrl-C, which cancels this coroutine
+        if writer:
+            flusher.cancel()
+            writer.close()
     elapsed = (datetime.now() - start_time).total_seconds()
     
     print("\n" + "=" * 60)
     print(f"[+] Scan Complete!")
-    print(f"[+] {len(results)} open ports found")
-    print(f"[+] Scanned {len(ports)} ports in {elapsed:.2f} seconds")
-    print(f"[+] Rate: {len(ports)/elapsed:.0f} ports/second")
+    print(f"[+] {scanner.stats['open']} open ports found")
+    print(f"[+] Scanned {len(ports)} ports on {hosts} hosts in {elapsed:.2f} seconds")
+    print(f"[+] Rate: {len(ports) * hosts / elapsed:.0f} ports/second")
+    stats = scanner.stats
+    print(f"[+] Closed: {stats['closed']} | "
+          f"{'Open|Filtered' if args.udp else 'Filtered'}: {stats['filtered']} | "
+          f"Unreachable: {stats['unreachable']} | Errors: {stats['error']} | "
+          f"Retries: {stats['retries']}")
+    if stats['local_errors']:
+        print(f"[!] Local errors: {stats['local_errors']} (out of fds or ports), in-flight "
+              f"limit settled at {int(scanner.limiter.limit)}/{scanner.limiter.maximum}")
     
+    if args.ndjson:
+        print(f"[+] Results streamed to: {args.ndjson}")
     if args.output:
-        import json
         with open(args.output, 'w') as f:
             json.dump({
-                'target': args.target,
+                'targets': scanner.targets,
+                'hosts': hosts,
                 'scan_time': datetime.now().isoformat(),
                 'ports_scanned': len(ports),
                 'open_ports': results
@@ -168,25 +1124,66 @@ def main():
     parser = argparse.ArgumentParser(
         description='NullSec Port Scanner - Fast Async Port Scanner'
     )
-    parser.add_argument('target', help='Target IP or hostname')
+    parser.add_argument('targets', nargs='*', metavar='target',
+                       help='Target IPs, hostnames or CIDR ranges (comma or space separated)')
+    parser.add_argument('-iL', '--input-file', metavar='FILE',
+                       help='Read targets from a file, one or more per line')
     parser.add_argument('-p', '--ports', default='common',
                        help='Port specification: common, top100, all, 1-1000, 80,443,8080')
     parser.add_argument('-t', '--timeout', type=float, default=1.0,
-                       help='Connection timeout (default: 1.0s)')
+                       help='Maximum connection timeout, per-host timeouts adapt below it '
+                            'from measured RTTs (default: 1.0s)')
+    parser.add_argument('--min-timeout', type=float, default=0.25,
+                       help='Lower bound for adaptive timeouts (default: 0.25s)')
+    parser.add_argument('--retries', type=int, default=1,
+                       help='Retries for probes that timed out under an adaptive timeout, '
+                            'or resend passes for unanswered SYNs (default: 1)')
     parser.add_argument('-c', '--concurrency', type=int, default=500,
-                       help='Max concurrent connections (default: 500)')
-    parser.add_argument('-o', '--output', help='Output file (JSON)')
+                       help='Max concurrent connections, lowered automatically on lost '
+                            'probes and local errors (default: 500)')
+    parser.add_argument('--banner-concurrency', type=int, default=100,
+                       help='Concurrent banner grabs on open ports (default: 100, 0 disables)')
+    parser.add_argument('--banner-timeout', type=float, default=1.0,
+                       help='Banner read timeout (default: 1.0s)')
+    parser.add_argument('-sS', '--syn', action='store_true',
+                       help='Half-open SYN scan over a raw socket (Linux, root only, IPv4)')
+    parser.add_argument('-sU', '--udp', action='store_true',
+                       help='UDP scan with service-specific payloads')
+    parser.add_argument('--rate', type=float,
+                       help=f'Max probes per second, for UDP and SYN scans '
+                            f'(default: {UDP_RATE} for UDP, unlimited otherwise, 0 disables)')
+    parser.add_argument('-o', '--output', help='Output file (JSON), written when the scan ends')
+    parser.add_argument('--ndjson', metavar='FILE',
+                       help='Append each open port to FILE as a JSON line as soon as it is found')
+    parser.add_argument('--flush-interval', type=float, default=1.0,
+                       help='Max seconds a found port waits in the --ndjson buffer (default: 1.0)')
     
     args = parser.parse_args()
     
-    # Resolve hostname
-    try:
-        socket.gethostbyname(args.target)
-    except socket.gaierror:
-        print(f"[-] Error: Cannot resolve hostname '{args.target}'")
-        sys.exit(1)
+    if args.input_file:
+        try:
+            args.targets += read_target_file(args.input_file)
+        except OSError as e:
+            print(f"[-] Error: Cannot read target file: {e}")
+            sys.exit(1)
+    if not args.targets:
+        parser.error('at least one target or --input-file is required')
+    if args.syn and args.udp:
+        parser.error('--syn and --udp are exclusive')
+    if args.rate is None:
+        args.rate = UDP_RATE if args.udp else 0
+    if args.syn and (not sys.platform.startswith('linux') or os.geteuid() != 0):
+        parser.error('--syn needs root on Linux')
     
-    asyncio.run(main_async(args))
+    # Hostnames are resolved once in main_async, every probe then connects
+    # straight to the address
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        print("\n\n[!] Scan interrupted by user")
+        if args.ndjson:
+            print(f"[+] Results so far are in: {args.ndjson}")
+        sys.exit(130)
 
 
 if __name__ == '__main__':